@@ -0,0 +1,166 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from scipy import stats
+
+# Benchmarks del detector y del codificador Huffman. Las versiones originales del
+# codigo (chi cuadrado de 256 pasadas, decodificacion bit a bit) solo se conservan
+# aqui como referencia de tiempos; huffman.py usa las vectorizadas.
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DIR)
+
+from huffman import CodificadorHuffman, LSBDetector
+
+
+def chi_cuadrado_256_pasadas(channel_data_flat):
+    # version original: 256 recorridos de la imagen, uno por valor de pixel
+    pairs_observed = []
+    pairs_expected = []
+    for i in range(0, 256, 2):
+        even_count = np.sum(channel_data_flat == i)
+        odd_count = np.sum(channel_data_flat == i + 1)
+        pairs_observed.extend([even_count, odd_count])
+        expected = (even_count + odd_count) / 2
+        pairs_expected.extend([expected, expected])
+    pairs_observed = np.array(pairs_observed)
+    pairs_expected = np.array(pairs_expected)
+    mask = pairs_expected > 0
+    chi2 = np.sum((pairs_observed[mask] - pairs_expected[mask])**2 / pairs_expected[mask])
+    df = len(pairs_observed[mask]) - 1
+    p_value = 1 - stats.chi2.cdf(chi2, df) if df > 0 else 1
+    return chi2, p_value, df
+
+
+def benchmark_chi_cuadrado(resoluciones=((3840, 2160), (7680, 4320)), repeticiones=3):
+    detector = LSBDetector()
+    print("\n" + "="*70)
+    print("BENCHMARK: Chi cuadrado (256 pasadas vs histograma con bincount)")
+    print("="*70)
+    for ancho, alto in resoluciones:
+        flat = np.random.randint(0, 256, ancho * alto, dtype=np.uint8)
+        print(f"\n{ancho}x{alto} = {flat.size:,} pixeles")
+
+        tiempos_256, tiempos_hist, tiempos_compartido = [], [], []
+        histograma = np.bincount(flat, minlength=256)
+        for _ in range(repeticiones):
+            t0 = time.time()
+            chi2_256, _, _ = chi_cuadrado_256_pasadas(flat)
+            t1 = time.time()
+            chi2_hist, _, _ = detector.chi_square_test(flat)
+            t2 = time.time()
+            detector.chi_square_test_hist(histograma)
+            t3 = time.time()
+            tiempos_256.append(t1 - t0)
+            tiempos_hist.append(t2 - t1)
+            tiempos_compartido.append(t3 - t2)
+
+        t_256 = np.mean(tiempos_256)
+        t_hist = np.mean(tiempos_hist)
+        t_compartido = np.mean(tiempos_compartido)
+        print(f"  256 pasadas:            {t_256:.5f} s")
+        print(f"  bincount:               {t_hist:.5f} s  ({t_256 / t_hist:.1f}x)")
+        print(f"  histograma compartido:  {t_compartido:.6f} s")
+        print(f"  Mismo resultado: {np.isclose(chi2_256, chi2_hist)}")
+
+
+def decodificar_texto_cadena(texto_binario, codigos):
+    # version original: recorre la cadena de bits y busca cada prefijo en el diccionario
+    if not texto_binario or not codigos:
+        return ""
+    codigos_inv = {v: k for k, v in codigos.items()}
+    texto_decodificado = []
+    codigo_actual = ""
+    for bit in texto_binario:
+        codigo_actual += bit
+        if codigo_actual in codigos_inv:
+            texto_decodificado.append(codigos_inv[codigo_actual])
+            codigo_actual = ""
+    return ''.join(texto_decodificado)
+
+
+def benchmark_decodificacion(ruta=None, megabytes=100, megabytes_original=2):
+    codificador = CodificadorHuffman()
+    if ruta:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            texto = f.read()
+    else:
+        palabras = ("el la de que y a en un ser se no haber por con su para como estar tener "
+                    "le lo todo pero mas hacer o poder decir este ir otro ese si me ya ver porque "
+                    "dar cuando muy sin vez mucho saber sobre tambien hasta dos").split()
+        indices = np.random.randint(0, len(palabras), megabytes * (1 << 20) // 4)
+        texto = ' '.join(palabras[i] for i in indices)[:megabytes * (1 << 20)]
+    mb = len(texto.encode('utf-8')) / (1 << 20)
+    print("\n" + "="*70)
+    print(f"BENCHMARK: decodificación Huffman ({mb:.1f} MB)")
+    print("="*70)
+
+    t0 = time.time()
+    datos, n_bits, codigos, estadisticas = codificador.codificar_bytes(texto)
+    t1 = time.time()
+    print(f"Codificación (bytes):        {t1 - t0:.2f} s  ({mb / (t1 - t0):.1f} MB/s)")
+    print(f"Longitud máxima de código:   {max(len(c) for c in codigos.values())} bits")
+    print(f"Ahorro:                      {estadisticas['ahorro_porcentual']:.1f}%")
+
+    t0 = time.time()
+    recuperado = codificador.decodificar_bytes(datos, n_bits, codigos)
+    t1 = time.time()
+    print(f"Decodificación por tabla:    {t1 - t0:.2f} s  ({mb / (t1 - t0):.1f} MB/s)  correcto={recuperado == texto}")
+
+    muestra = texto[:megabytes_original * (1 << 20)]
+    mb_muestra = len(muestra.encode('utf-8')) / (1 << 20)
+    bits_muestra = ''.join(codigos[c] for c in muestra)
+    t0 = time.time()
+    decodificar_texto_cadena(bits_muestra, codigos)
+    t1 = time.time()
+    print(f"Decodificación bit a bit:    {t1 - t0:.2f} s para {mb_muestra:.1f} MB  ({mb_muestra / (t1 - t0):.1f} MB/s)")
+
+
+def benchmark_longitud_maxima(limites=(None, 24, 16, 12, 8), n_simbolos=32):
+    # texto muy sesgado (frecuencias de Fibonacci) que produce codigos de 30+ bits
+    fib = [1, 1]
+    while len(fib) < n_simbolos:
+        fib.append(fib[-1] + fib[-2])
+    indices = np.repeat(np.arange(n_simbolos), fib)
+    np.random.shuffle(indices)
+    texto = ''.join(chr(97 + i) for i in indices)
+    mb = len(texto) / (1 << 20)
+    print("\n" + "="*70)
+    print(f"BENCHMARK: códigos de longitud limitada ({mb:.1f} MB, {n_simbolos} símbolos)")
+    print("="*70)
+    print(f"{'Límite':>8} {'Máx. bits':>10} {'Ratio':>8} {'Costo':>8} {'Decodificación':>16}")
+    for limite in limites:
+        codificador = CodificadorHuffman(limite)
+        datos, n_bits, codigos, estadisticas = codificador.codificar_bytes(texto)
+        t0 = time.time()
+        recuperado = codificador.decodificar_bytes(datos, n_bits, codigos)
+        t1 = time.time()
+        assert recuperado == texto
+        print(f"{str(limite):>8} {estadisticas['longitud_maxima_codigo']:>10} "
+              f"{estadisticas['ratio_compresion']:>8.4f} {estadisticas['costo_limite_porcentual']:>7.2f}% "
+              f"{mb / (t1 - t0):>11.1f} MB/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del detector LSB y del codificador Huffman")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("chi", help="chi cuadrado: 256 pasadas vs bincount en 4K y 8K")
+    p.add_argument("--repeticiones", type=int, default=3)
+    p = sub.add_parser("decodificacion", help="Huffman: decodificación por tabla vs bit a bit")
+    p.add_argument("ruta", nargs="?", default=None, help="Texto a codificar (por defecto 100 MB sintéticos)")
+    sub.add_parser("longitud", help="Huffman: costo y velocidad de los códigos de longitud limitada")
+
+    args = parser.parse_args(argv)
+    if args.comando == "chi":
+        benchmark_chi_cuadrado(repeticiones=args.repeticiones)
+    elif args.comando == "decodificacion":
+        benchmark_decodificacion(args.ruta)
+    else:
+        benchmark_longitud_maxima()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,106 +3,572 @@ import numpy as np
 from PIL import Image
 from scipy import stats
 import os
+import sys
+import io
+import csv
 import glob
+import re
 import time
 import heapq
+import argparse
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 import json
+import zlib
 
+EXTENSIONES_IMAGEN = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff']
 
-class NodoHuffman:
-    
-    def __init__(self, caracter=None, frecuencia=0, izquierda=None, derecha=None):
-        self.caracter = caracter
-        self.frecuencia = frecuencia
-        self.izquierda = izquierda
-        self.derecha = derecha
-    
-    def __lt__(self, otro):
-        return self.frecuencia < otro.frecuencia
-    
-    def __eq__(self, otro):
-        return self.frecuencia == otro.frecuencia
+# contenedor binario: MAGIA | varint max_long | conteo por longitud | simbolos (orden canonico)
+#                    | varint bits de datos | datos empaquetados | CRC32
+MAGIA_HUFFMAN = b"HF\x01"
+# orden 1: MAGIA | tabla base | varint n_contextos | (varint contexto, tabla) ... | varint bits | datos | CRC32
+MAGIA_HUFFMAN_ORDEN1 = b"HF\x02"
+# palabras: MAGIA | vocabulario | tabla de caracteres | varint bits | datos | CRC32
+MAGIA_HUFFMAN_PALABRAS = b"HF\x03"
+MAGIAS_HUFFMAN = (MAGIA_HUFFMAN, MAGIA_HUFFMAN_ORDEN1, MAGIA_HUFFMAN_PALABRAS)
+
+# tokens: palabras, espacios seguidos y signos sueltos; al concatenarlos se recupera el texto
+PATRON_TOKENS = re.compile(r"\w+|\s+|[^\w\s]")
+PATRON_PALABRA = re.compile(r"\w+")
+# en el vocabulario, "" es el escape para palabras raras, que se deletrean con la tabla
+# de caracteres y terminan con FIN_PALABRA (nunca aparece dentro de una palabra \w+)
+ESCAPE = ""
+FIN_PALABRA = "\x00"
+
+CAMPOS_LOTE = ['ruta', 'chi2', 'p_valor', 'entropia', 'media_lsb', 'rachas_z', 'rachas_p',
+               'corr_horizontal', 'corr_vertical', 'sospecha', 'mensaje', 'pixeles_leidos', 'error']
+
+
+def _escribir_varint(valor, salida):
+    while True:
+        byte = valor & 0x7F
+        valor >>= 7
+        if valor:
+            salida.append(byte | 0x80)
+        else:
+            salida.append(byte)
+            return salida
+
+
+def _leer_varint(datos, pos):
+    # IndexError si los datos terminan antes que el varint
+    valor = 0
+    desplazamiento = 0
+    while True:
+        byte = datos[pos]
+        pos += 1
+        valor |= (byte & 0x7F) << desplazamiento
+        if not byte & 0x80:
+            return valor, pos
+        desplazamiento += 7
+        if desplazamiento > 63:
+            raise ValueError("Varint inválido")
 
 
 class CodificadorHuffman:
     
-    def __init__(self):
-        self.raiz = None
+    def __init__(self, longitud_maxima=None):
         self.codigos = {}
         self.codigos_inversos = {}
+        # limite opcional de bits por codigo (package-merge); None = Huffman sin limite
+        self.longitud_maxima = longitud_maxima
+        self.bits_sin_limite = None
     
     def calcular_frecuencias(self, texto):
         return Counter(texto)
     
-    def construir_arbol(self, frecuencias):
-        if not frecuencias:
-            return None
-        heap = [NodoHuffman(caracter=car, frecuencia=freq) for car, freq in frecuencias.items()]
-        heapq.heapify(heap)
-        while len(heap) > 1:
-            izq = heapq.heappop(heap)
-            der = heapq.heappop(heap)
-            padre = NodoHuffman(frecuencia=izq.frecuencia + der.frecuencia, izquierda=izq, derecha=der)
-            heapq.heappush(heap, padre)
-        return heap[0] if heap else None
-    
-    def generar_codigos(self, nodo=None, codigo_actual=""):
-        if nodo is None:
-            nodo = self.raiz
-            self.codigos = {}
-            self.codigos_inversos = {}
-        if nodo is None:
-            return
-        if nodo.caracter is not None:
-            codigo = codigo_actual if codigo_actual else "0"
-            self.codigos[nodo.caracter] = codigo
-            self.codigos_inversos[codigo] = nodo.caracter
-            return
-        if nodo.izquierda:
-            self.generar_codigos(nodo.izquierda, codigo_actual + "0")
-        if nodo.derecha:
-            self.generar_codigos(nodo.derecha, codigo_actual + "1")
+    def longitudes_limitadas(self, frecuencias, longitud_maxima):
+        # package-merge (Larmore-Hirschberg): longitudes optimas sin superar longitud_maxima.
+        # Cada elemento es (peso, nodo); nodo es un simbolo o un par de elementos empaquetados
+        simbolos = sorted(frecuencias, key=lambda c: (frecuencias[c], c))
+        n = len(simbolos)
+        if n == 1:
+            return {simbolos[0]: 1}
+        if (1 << longitud_maxima) < n:
+            raise ValueError(f"{n} símbolos no caben en códigos de {longitud_maxima} bits")
+        hojas = [(frecuencias[c], c) for c in simbolos]
+        lista = hojas
+        for _ in range(longitud_maxima - 1):
+            paquetes = [(lista[i][0] + lista[i + 1][0], (lista[i], lista[i + 1]))
+                        for i in range(0, len(lista) - 1, 2)]
+            lista = list(heapq.merge(hojas, paquetes, key=lambda x: x[0]))
+        # la longitud de cada simbolo es cuantas veces aparece en los 2n-2 elementos mas ligeros
+        longitudes = dict.fromkeys(simbolos, 0)
+        pendientes = [nodo for _, nodo in lista[:2 * n - 2]]
+        while pendientes:
+            nodo = pendientes.pop()
+            if isinstance(nodo, tuple):
+                pendientes.append(nodo[0][1])
+                pendientes.append(nodo[1][1])
+            else:
+                longitudes[nodo] += 1
+        return longitudes
     
-    def codificar_texto(self, texto):
-        if not texto:
-            return "", {}, {}
+    def longitudes_codigo(self, frecuencias):
+        # metodo de dos colas: con las hojas ordenadas por frecuencia, los nodos internos
+        # salen en orden no decreciente, asi que el minimo siempre esta al frente de la
+        # cola de hojas o de la de internos. O(n) despues de ordenar, con arreglos
+        # paralelos (peso, padre) en lugar de un arbol de nodos y heapq
+        simbolos = sorted(frecuencias, key=lambda c: (frecuencias[c], c))
+        n = len(simbolos)
+        if n == 1:
+            return {simbolos[0]: 1}
+        peso = [frecuencias[c] for c in simbolos] + [0] * (n - 1)
+        padre = [0] * (2 * n - 1)
+        hoja, interno = 0, n
+        for nuevo in range(n, 2 * n - 1):
+            if hoja < n and (interno == nuevo or peso[hoja] <= peso[interno]):
+                a, hoja = hoja, hoja + 1
+            else:
+                a, interno = interno, interno + 1
+            if hoja < n and (interno == nuevo or peso[hoja] <= peso[interno]):
+                b, hoja = hoja, hoja + 1
+            else:
+                b, interno = interno, interno + 1
+            peso[nuevo] = peso[a] + peso[b]
+            padre[a] = padre[b] = nuevo
+        # cada padre tiene indice mayor que sus hijos y la raiz es el ultimo nodo,
+        # asi que las profundidades salen en un recorrido descendente sin recursion
+        profundidad = [0] * (2 * n - 1)
+        for i in range(2 * n - 3, -1, -1):
+            profundidad[i] = profundidad[padre[i]] + 1
+        return {c: profundidad[i] for i, c in enumerate(simbolos)}
+    
+    def preparar_codigos(self, texto):
         frecuencias = self.calcular_frecuencias(texto)
-        self.raiz = self.construir_arbol(frecuencias)
-        self.generar_codigos()
-        texto_codificado = ''.join(self.codigos[c] for c in texto)
-        longitud_original = len(texto) * 8
-        longitud_comprimida = len(texto_codificado)
+        # longitudes por dos colas y codigos canonicos, sin construir el arbol
+        longitudes = self.longitudes_codigo(frecuencias)
+        self.bits_sin_limite = sum(frecuencias[c] * l for c, l in longitudes.items())
+        if self.longitud_maxima and max(longitudes.values()) > self.longitud_maxima:
+            longitudes = self.longitudes_limitadas(frecuencias, self.longitud_maxima)
+        self.codigos = self.codigos_canonicos(longitudes)
+        self.codigos_inversos = {v: k for k, v in self.codigos.items()}
+        return frecuencias
+    
+    def _estadisticas(self, frecuencias, longitud_texto, longitud_comprimida):
+        longitud_original = longitud_texto * 8
         ratio = longitud_comprimida / longitud_original if longitud_original > 0 else 0
         ahorro = (1 - ratio) * 100
-        estadisticas = {
+        ratio_sin_limite = self.bits_sin_limite / longitud_original if longitud_original > 0 else 0
+        return {
             'longitud_original_bits': longitud_original,
             'longitud_comprimida_bits': longitud_comprimida,
             'ratio_compresion': ratio,
             'ahorro_porcentual': ahorro,
-            'caracteres_unicos': len(frecuencias)
+            'caracteres_unicos': len(frecuencias),
+            'longitud_maxima_codigo': max(len(c) for c in self.codigos.values()),
+            # costo del limite de longitud frente al Huffman sin limite (0 si no se aplico)
+            'ratio_sin_limite': ratio_sin_limite,
+            'costo_limite_porcentual': (ratio - ratio_sin_limite) / ratio_sin_limite * 100 if ratio_sin_limite else 0
         }
+    
+    def codificar_texto(self, texto):
+        if not texto:
+            return "", {}, {}
+        frecuencias = self.preparar_codigos(texto)
+        texto_codificado = ''.join(self.codigos[c] for c in texto)
+        estadisticas = self._estadisticas(frecuencias, len(texto), len(texto_codificado))
         return texto_codificado, self.codigos, estadisticas
     
+    def codificar_bytes(self, texto, bloque=1 << 20):
+        # igual que codificar_texto pero devuelve los bits empaquetados (bytes, n_bits)
+        if not texto:
+            return b"", 0, {}, {}
+        frecuencias = self.preparar_codigos(texto)
+        simbolos = sorted(self.codigos, key=ord)
+        puntos = np.array([ord(c) for c in simbolos], dtype=np.uint32)
+        # una fila de bits por simbolo; la mascara descarta el relleno de cada fila
+        max_long = max(len(c) for c in self.codigos.values())
+        patrones = np.zeros((len(simbolos), max_long), dtype=np.uint8)
+        longitudes = np.zeros(len(simbolos), dtype=np.int64)
+        for i, c in enumerate(simbolos):
+            codigo = self.codigos[c]
+            patrones[i, :len(codigo)] = [int(b) for b in codigo]
+            longitudes[i] = len(codigo)
+        columnas = np.arange(max_long)
+        
+        partes = []
+        n_bits = 0
+        resto = np.empty(0, dtype=np.uint8)
+        for inicio in range(0, len(texto), bloque):
+            cps = np.frombuffer(texto[inicio:inicio+bloque].encode('utf-32-le'), dtype=np.uint32)
+            idx = np.searchsorted(puntos, cps)
+            bits_bloque = patrones[idx][columnas < longitudes[idx][:, None]]
+            bits = np.concatenate((resto, bits_bloque))
+            corte = len(bits) - len(bits) % 8
+            partes.append(np.packbits(bits[:corte]).tobytes())
+            n_bits += corte
+            resto = bits[corte:]
+        partes.append(np.packbits(resto).tobytes())
+        n_bits += len(resto)
+        return b"".join(partes), n_bits, self.codigos, self._estadisticas(frecuencias, len(texto), n_bits)
+    
+    def _tabla_decodificacion(self, codigos):
+        # estados = prefijos pendientes (nodos internos del arbol); para cada estado y
+        # cada valor de los siguientes 8 bits se guardan los simbolos completos que
+        # produce ese byte y el estado en que queda. El ultimo estado marca un codigo invalido
+        estados = {"": 0}
+        for codigo in codigos.values():
+            for i in range(1, len(codigo)):
+                estados.setdefault(codigo[:i], len(estados))
+        invalido = len(estados)
+        inversos = {v: k for k, v in codigos.items()}
+        
+        tabla_bits = []
+        for prefijo in estados:
+            fila = []
+            for bit in "01":
+                siguiente = prefijo + bit
+                if siguiente in inversos:
+                    fila.append((inversos[siguiente], 0))
+                else:
+                    fila.append(("", estados.get(siguiente, invalido)))
+            tabla_bits.append(fila)
+        tabla_bits.append([("", invalido)] * 2)
+        
+        # componer tablas de 1 -> 2 -> 4 -> 8 bits
+        tabla = tabla_bits
+        for ancho in (1, 2, 4):
+            nueva = []
+            for fila_estado in tabla:
+                fila = []
+                for simbolos_alto, estado_alto in fila_estado:
+                    for simbolos_bajo, estado_bajo in tabla[estado_alto]:
+                        fila.append((simbolos_alto + simbolos_bajo, estado_bajo))
+                nueva.append(fila)
+            tabla = nueva
+        return tabla_bits, tabla, invalido
+    
+    def decodificar_bytes(self, datos, n_bits, codigos):
+        if not n_bits or not codigos:
+            return ""
+        tabla_bits, tabla, invalido = self._tabla_decodificacion(codigos)
+        completos = n_bits // 8
+        salida = []
+        agregar = salida.append
+        estado = 0
+        for byte in bytes(datos[:completos]):
+            simbolos, estado = tabla[estado][byte]
+            agregar(simbolos)
+        # bits del ultimo byte incompleto
+        if n_bits % 8:
+            byte = datos[completos]
+            for i in range(n_bits % 8):
+                simbolos, estado = tabla_bits[estado][(byte >> (7 - i)) & 1]
+                agregar(simbolos)
+        if estado == invalido:
+            raise ValueError("Código Huffman inválido")
+        return ''.join(salida)
+    
     def decodificar_texto(self, texto_binario, codigos):
         if not texto_binario or not codigos:
             return ""
-        codigos_inv = {v: k for k, v in codigos.items()}
-        texto_decodificado = []
-        codigo_actual = ""
-        for bit in texto_binario:
-            codigo_actual += bit
-            if codigo_actual in codigos_inv:
-                texto_decodificado.append(codigos_inv[codigo_actual])
-                codigo_actual = ""
-        return ''.join(texto_decodificado)
+        bits = np.frombuffer(texto_binario.encode('ascii'), dtype=np.uint8) - ord('0')
+        return self.decodificar_bytes(np.packbits(bits).tobytes(), len(texto_binario), codigos)
     
     def serializar_tabla(self, codigos):
         return json.dumps(codigos)
     
     def deserializar_tabla(self, tabla_json):
         return json.loads(tabla_json)
-
+    
+    def codigos_canonicos(self, longitudes):
+        # codigos canonicos: basta la longitud de cada simbolo para reconstruirlos
+        codigos = {}
+        codigo = 0
+        longitud_previa = 0
+        for simbolo, longitud in sorted(longitudes.items(), key=lambda x: (x[1], x[0])):
+            codigo <<= longitud - longitud_previa
+            codigos[simbolo] = format(codigo, f'0{longitud}b')
+            codigo += 1
+            longitud_previa = longitud
+        return codigos
+    
+    def _escribir_longitudes(self, longitudes, salida):
+        # tabla canonica: varint max_long | conteo por longitud | simbolos en orden canonico
+        max_long = max(longitudes.values())
+        conteos = [0] * max_long
+        for longitud in longitudes.values():
+            conteos[longitud - 1] += 1
+        _escribir_varint(max_long, salida)
+        for conteo in conteos:
+            _escribir_varint(conteo, salida)
+        for simbolo, _ in sorted(longitudes.items(), key=lambda x: (x[1], ord(x[0]))):
+            _escribir_varint(ord(simbolo), salida)
+    
+    def _leer_longitudes(self, datos, pos):
+        max_long, pos = _leer_varint(datos, pos)
+        if not 1 <= max_long <= 64:
+            raise ValueError("Longitud de código inválida")
+        conteos = []
+        for _ in range(max_long):
+            conteo, pos = _leer_varint(datos, pos)
+            conteos.append(conteo)
+        longitudes = {}
+        for longitud, conteo in enumerate(conteos, 1):
+            for _ in range(conteo):
+                simbolo, pos = _leer_varint(datos, pos)
+                longitudes[chr(simbolo)] = longitud
+        return longitudes, pos
+    
+    def empaquetar_payload(self, texto):
+        datos, n_bits, codigos, estadisticas = self.codificar_bytes(texto)
+        payload = bytearray(MAGIA_HUFFMAN)
+        self._escribir_longitudes({c: len(codigo) for c, codigo in codigos.items()}, payload)
+        _escribir_varint(n_bits, payload)
+        payload += datos
+        payload += zlib.crc32(payload).to_bytes(4, 'big')
+        return bytes(payload), self.codigos, estadisticas
+    
+    def _longitudes_limite(self, frecuencias):
+        # longitudes de Huffman que respetan longitud_maxima
+        longitudes = self.longitudes_codigo(frecuencias)
+        if self.longitud_maxima and max(longitudes.values()) > self.longitud_maxima:
+            longitudes = self.longitudes_limitadas(frecuencias, self.longitud_maxima)
+        return longitudes
+    
+    def empaquetar_payload_orden1(self, texto, umbral_contexto=8):
+        # orden 1: una tabla por simbolo anterior. Los contextos con menos de
+        # umbral_contexto apariciones, o cuya tabla cuesta mas bits de los que ahorra,
+        # usan la tabla de orden 0 (que tambien codifica el primer simbolo)
+        payload0, codigos_base, estadisticas = self.empaquetar_payload(texto)
+        base = {c: len(codigo) for c, codigo in codigos_base.items()}
+        siguientes = {}
+        for anterior, simbolo in zip(texto, texto[1:]):
+            siguientes.setdefault(anterior, Counter())[simbolo] += 1
+        
+        contextos = {}
+        for contexto, frecuencias in siguientes.items():
+            if sum(frecuencias.values()) < umbral_contexto:
+                continue
+            longitudes = self._longitudes_limite(frecuencias)
+            ahorro = sum(f * (base[c] - longitudes[c]) for c, f in frecuencias.items())
+            tabla = bytearray()
+            _escribir_varint(ord(contexto), tabla)
+            self._escribir_longitudes(longitudes, tabla)
+            if ahorro > len(tabla) * 8:
+                contextos[contexto] = longitudes
+        
+        codigos_contexto = {ctx: self.codigos_canonicos(l) for ctx, l in contextos.items()}
+        partes = [codigos_base[texto[0]]]
+        for anterior, simbolo in zip(texto, texto[1:]):
+            partes.append(codigos_contexto.get(anterior, codigos_base)[simbolo])
+        bits = np.frombuffer(''.join(partes).encode('ascii'), dtype=np.uint8) - ord('0')
+        
+        payload = bytearray(MAGIA_HUFFMAN_ORDEN1)
+        self._escribir_longitudes(base, payload)
+        _escribir_varint(len(contextos), payload)
+        for contexto in sorted(contextos, key=ord):
+            _escribir_varint(ord(contexto), payload)
+            self._escribir_longitudes(contextos[contexto], payload)
+        _escribir_varint(len(bits), payload)
+        payload += np.packbits(bits).tobytes()
+        payload += zlib.crc32(payload).to_bytes(4, 'big')
+        
+        estadisticas = dict(estadisticas)
+        estadisticas['longitud_comprimida_bits'] = len(bits)
+        estadisticas['ratio_compresion'] = len(bits) / estadisticas['longitud_original_bits']
+        estadisticas['ahorro_porcentual'] = (1 - estadisticas['ratio_compresion']) * 100
+        estadisticas['contextos'] = len(contextos)
+        estadisticas['contextos_podados'] = len(siguientes) - len(contextos)
+        # comparacion con orden 0 contando tablas, cabecera y CRC
+        estadisticas['bits_payload_orden0'] = len(payload0) * 8
+        estadisticas['bits_payload_orden1'] = len(payload) * 8
+        estadisticas['bits_ahorrados_vs_orden0'] = (len(payload0) - len(payload)) * 8
+        return bytes(payload), codigos_base, estadisticas
+    
+    def _escribir_vocabulario(self, longitudes, salida):
+        # como _escribir_longitudes, pero los simbolos son palabras: en orden canonico las
+        # palabras de un mismo largo de codigo quedan ordenadas, asi que se guardan con
+        # codificacion frontal (varint prefijo comun | varint largo del resto | resto utf-8)
+        max_long = max(longitudes.values())
+        conteos = [0] * max_long
+        for longitud in longitudes.values():
+            conteos[longitud - 1] += 1
+        _escribir_varint(max_long, salida)
+        for conteo in conteos:
+            _escribir_varint(conteo, salida)
+        anterior = b""
+        for palabra, _ in sorted(longitudes.items(), key=lambda x: (x[1], x[0])):
+            actual = palabra.encode('utf-8')
+            comun = 0
+            limite = min(len(anterior), len(actual))
+            while comun < limite and anterior[comun] == actual[comun]:
+                comun += 1
+            _escribir_varint(comun, salida)
+            _escribir_varint(len(actual) - comun, salida)
+            salida += actual[comun:]
+            anterior = actual
+    
+    def _leer_vocabulario(self, datos, pos):
+        max_long, pos = _leer_varint(datos, pos)
+        if not 1 <= max_long <= 64:
+            raise ValueError("Longitud de código inválida")
+        conteos = []
+        for _ in range(max_long):
+            conteo, pos = _leer_varint(datos, pos)
+            conteos.append(conteo)
+        longitudes = {}
+        anterior = b""
+        for longitud, conteo in enumerate(conteos, 1):
+            for _ in range(conteo):
+                comun, pos = _leer_varint(datos, pos)
+                resto, pos = _leer_varint(datos, pos)
+                if pos + resto > len(datos):
+                    raise IndexError("Vocabulario incompleto")
+                anterior = anterior[:comun] + datos[pos:pos + resto]
+                pos += resto
+                longitudes[anterior.decode('utf-8')] = longitud
+        return longitudes, pos
+    
+    def empaquetar_payload_palabras(self, texto, min_frecuencia=2):
+        # alfabeto de tokens: las palabras con menos de min_frecuencia apariciones se
+        # envian como ESCAPE + sus caracteres + FIN_PALABRA; espacios y signos siempre
+        # entran al vocabulario
+        tokens = PATRON_TOKENS.findall(texto)
+        conteo = Counter(tokens)
+        frecuencias = Counter()
+        frecuencias_caracteres = Counter()
+        for token, n in conteo.items():
+            if n >= min_frecuencia or not PATRON_PALABRA.fullmatch(token):
+                frecuencias[token] = n
+            else:
+                frecuencias[ESCAPE] += n
+                frecuencias_caracteres.update(token * n)
+                frecuencias_caracteres[FIN_PALABRA] += n
+        if not frecuencias_caracteres:
+            frecuencias_caracteres[FIN_PALABRA] = 1
+        
+        vocabulario = self._longitudes_limite(frecuencias)
+        caracteres = self._longitudes_limite(frecuencias_caracteres)
+        codigos = self.codigos_canonicos(vocabulario)
+        codigos_caracteres = self.codigos_canonicos(caracteres)
+        partes = []
+        for token in tokens:
+            codigo = codigos.get(token)
+            if codigo is None:
+                partes.append(codigos[ESCAPE])
+                partes.extend(codigos_caracteres[c] for c in token)
+                partes.append(codigos_caracteres[FIN_PALABRA])
+            else:
+                partes.append(codigo)
+        bits = np.frombuffer(''.join(partes).encode('ascii'), dtype=np.uint8) - ord('0')
+        
+        payload = bytearray(MAGIA_HUFFMAN_PALABRAS)
+        self._escribir_vocabulario(vocabulario, payload)
+        bits_vocabulario = len(payload) * 8
+        self._escribir_longitudes(caracteres, payload)
+        _escribir_varint(len(bits), payload)
+        payload += np.packbits(bits).tobytes()
+        payload += zlib.crc32(payload).to_bytes(4, 'big')
+        
+        longitud_original = len(texto) * 8
+        ratio = len(bits) / longitud_original if longitud_original else 0
+        estadisticas = {
+            'longitud_original_bits': longitud_original,
+            'longitud_comprimida_bits': len(bits),
+            'ratio_compresion': ratio,
+            'ahorro_porcentual': (1 - ratio) * 100,
+            'caracteres_unicos': len(set(texto)),
+            'longitud_maxima_codigo': max(vocabulario.values()),
+            'tokens': len(tokens),
+            'vocabulario': len(vocabulario),
+            'tokens_escapados': frecuencias[ESCAPE],
+            'bits_vocabulario': bits_vocabulario,
+            'bits_payload': len(payload) * 8
+        }
+        return bytes(payload), codigos, estadisticas
+    
+    def _decodificar_palabras(self, datos, n_bits, codigos, caracteres):
+        inversos = {v: k for k, v in codigos.items()}
+        inversos_caracteres = {v: k for k, v in self.codigos_canonicos(caracteres).items()}
+        bits = np.unpackbits(np.frombuffer(datos, dtype=np.uint8))[:n_bits] + ord('0')
+        salida = []
+        actual = inversos
+        codigo = ""
+        for bit in bits.tobytes().decode('ascii'):
+            codigo += bit
+            simbolo = actual.get(codigo)
+            if simbolo is None:
+                continue
+            codigo = ""
+            if actual is inversos:
+                if simbolo == ESCAPE:
+                    actual = inversos_caracteres
+                else:
+                    salida.append(simbolo)
+            elif simbolo == FIN_PALABRA:
+                actual = inversos
+            else:
+                salida.append(simbolo)
+        if codigo or actual is not inversos:
+            raise ValueError("Código Huffman inválido")
+        return ''.join(salida)
+    
+    def _leer_cabecera(self, datos):
+        # (longitudes base, tablas extra, bits de datos, posicion de los datos). Las tablas
+        # extra son las longitudes por contexto (orden 1) o la tabla de caracteres (palabras)
+        if datos.startswith(MAGIA_HUFFMAN):
+            longitudes, pos = self._leer_longitudes(datos, len(MAGIA_HUFFMAN))
+            contextos = {}
+        elif datos.startswith(MAGIA_HUFFMAN_PALABRAS):
+            longitudes, pos = self._leer_vocabulario(datos, len(MAGIA_HUFFMAN_PALABRAS))
+            contextos, pos = self._leer_longitudes(datos, pos)
+        elif datos.startswith(MAGIA_HUFFMAN_ORDEN1):
+            longitudes, pos = self._leer_longitudes(datos, len(MAGIA_HUFFMAN_ORDEN1))
+            n_contextos, pos = _leer_varint(datos, pos)
+            contextos = {}
+            for _ in range(n_contextos):
+                contexto, pos = _leer_varint(datos, pos)
+                contextos[chr(contexto)], pos = self._leer_longitudes(datos, pos)
+        else:
+            raise ValueError("No es un payload Huffman binario")
+        n_bits, pos = _leer_varint(datos, pos)
+        return longitudes, contextos, n_bits, pos
+    
+    def leer_cabecera_payload(self, datos):
+        # devuelve (longitudes, bits de datos, posicion de los datos); IndexError si incompleta
+        longitudes, _, n_bits, pos = self._leer_cabecera(datos)
+        return longitudes, n_bits, pos
+    
+    def longitud_payload(self, datos):
+        longitudes, n_bits, pos = self.leer_cabecera_payload(datos)
+        return pos + (n_bits + 7) // 8 + 4
+    
+    def desempaquetar_payload(self, datos):
+        longitudes, contextos, n_bits, pos = self._leer_cabecera(datos)
+        fin = pos + (n_bits + 7) // 8
+        if len(datos) < fin + 4:
+            raise ValueError("Payload incompleto")
+        if zlib.crc32(datos[:fin]) != int.from_bytes(datos[fin:fin+4], 'big'):
+            raise ValueError("CRC no coincide")
+        codigos = self.codigos_canonicos(longitudes)
+        if datos.startswith(MAGIA_HUFFMAN_ORDEN1):
+            return self._decodificar_orden1(datos[pos:fin], n_bits, codigos, contextos), codigos
+        if datos.startswith(MAGIA_HUFFMAN_PALABRAS):
+            return self._decodificar_palabras(datos[pos:fin], n_bits, codigos, contextos), codigos
+        return self.decodificar_bytes(datos[pos:fin], n_bits, codigos), codigos
+    
+    def _decodificar_orden1(self, datos, n_bits, codigos, contextos):
+        # la tabla cambia con cada simbolo, asi que se decodifica simbolo a simbolo
+        inversos_base = {v: k for k, v in codigos.items()}
+        inversos = {ctx: {v: k for k, v in self.codigos_canonicos(l).items()}
+                    for ctx, l in contextos.items()}
+        bits = np.unpackbits(np.frombuffer(datos, dtype=np.uint8))[:n_bits] + ord('0')
+        salida = []
+        actual = inversos_base
+        codigo = ""
+        for bit in bits.tobytes().decode('ascii'):
+            codigo += bit
+            simbolo = actual.get(codigo)
+            if simbolo is not None:
+                salida.append(simbolo)
+                actual = inversos.get(simbolo, inversos_base)
+                codigo = ""
+        if codigo:
+            raise ValueError("Código Huffman inválido")
+        return ''.join(salida)
 
 class LSBDetector:
   
@@ -150,20 +616,36 @@ class LSBDetector:
      
         return top_half + bottom_half
 
-    def _bits_to_text(self, lsb_bits):
-        
+    def _lsb_bits_vectorizado(self, channel_2d):
+        # plano LSB completo en una sola operacion, empaquetado 8 bits por byte
+        return np.packbits(channel_2d.reshape(-1) & 1).tobytes()
+
+    def _extraer_bits(self, canal, metodo):
+        if metodo == 'vectorizado':
+            return self._lsb_bits_vectorizado(canal), "Vectorizado"
+        if metodo == 'divide_y_venceras':
+            return self._lsb_bits_divide_and_conquer(canal), "Divide y Vencerás"
+        return self._lsb_bits_brute(canal), "Fuerza Bruta"
+
+    def _bits_a_bytes(self, lsb_bits):
+        # acepta el buffer empaquetado o la lista de '0'/'1' de los otros metodos
+        if isinstance(lsb_bits, (bytes, bytearray)):
+            return bytes(lsb_bits)
+        return bytes(int(''.join(lsb_bits[i:i+8]), 2) for i in range(0, len(lsb_bits) - 7, 8))
+
+    def _bits_to_text(self, lsb_bits, solo_confirmado=False):
+        # solo_confirmado: sin el terminador END no hay mensaje (en una imagen limpia
+        # el prefijo imprimible de los LSB aleatorios no significa nada)
         mensaje = ""
-        for i in range(0, len(lsb_bits), 8):
-            byte = lsb_bits[i:i+8]
-            if len(byte) < 8:
-                continue
-            code = int(''.join(byte), 2)
+        for code in self._bits_a_bytes(lsb_bits):
             if 32 <= code <= 126:
                 mensaje += chr(code)
             else:
                 break
             if mensaje.endswith("END"):
                 return mensaje[:-3]
+        if solo_confirmado:
+            return None
         return mensaje if mensaje else None
 
     def extraer_mensaje_lsb(self, image_path, metodo='fuerza_bruta'):
@@ -172,12 +654,7 @@ class LSBDetector:
                 return None
             canal_rojo = self.image[:, :, 0]
             start = time.time()
-            if metodo == 'divide_y_venceras':
-                lsb_bits = self._lsb_bits_divide_and_conquer(canal_rojo)
-                metodo_nombre = "Divide y Vencerás"
-            else:
-                lsb_bits = self._lsb_bits_brute(canal_rojo)
-                metodo_nombre = "Fuerza Bruta"
+            lsb_bits, metodo_nombre = self._extraer_bits(canal_rojo, metodo)
             end = time.time()
             print(f"Tiempo {metodo_nombre}: {end - start:.5f} s")
             return self._bits_to_text(lsb_bits)
@@ -185,52 +662,92 @@ class LSBDetector:
             print(f"Error extrayendo mensaje: {e}")
             return None
 
-    def ocultar_mensaje_huffman(self, image_path, mensaje, output_path, channel=0):
-       
+    def payloads_huffman(self, mensaje, modo=None):
+        # modos: 'orden0' (una tabla), 'orden1' (una tabla por simbolo anterior),
+        # 'palabras' (alfabeto de tokens con escape); None = todos
+        if not mensaje:
+            return []
+        if modo == 'orden1' and len(mensaje) < 2:
+            # sin simbolo anterior no hay contextos: orden 1 seria orden 0 con tablas de mas
+            print("Orden 1 necesita al menos 2 caracteres; se usa orden 0")
+            modo = 'orden0'
+        candidatos = []
+        if modo in (None, 'orden0'):
+            candidatos.append(('orden0',) + self.huffman.empaquetar_payload(mensaje))
+        if modo in (None, 'orden1') and len(mensaje) > 1:
+            candidatos.append(('orden1',) + self.huffman.empaquetar_payload_orden1(mensaje))
+        if modo in (None, 'palabras'):
+            candidatos.append(('palabras',) + self.huffman.empaquetar_payload_palabras(mensaje))
+        return candidatos
+    
+    def _lsb_modificados(self, lsb_canal, payload):
+        # pixeles cuyo LSB cambia al incrustar el payload (los que no caben cuentan como cambio)
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+        n = min(len(bits), lsb_canal.size)
+        return int(np.count_nonzero(lsb_canal[:n] != bits[:n])) + len(bits) - n
+    
+    def comparar_modos_payload(self, image_path, mensajes, channel=0):
+        if not self.load_image(image_path):
+            return None
+        lsb_canal = self.image[:, :, channel].reshape(-1) & 1
+        resultados = []
+        print(f"\n{'Mensaje':>10} {'Modo':>10} {'Bits':>10} {'LSB modificados':>16}")
+        for i, mensaje in enumerate(mensajes):
+            for modo, payload, _, _ in self.payloads_huffman(mensaje):
+                cambios = self._lsb_modificados(lsb_canal, payload)
+                resultados.append((i, modo, len(payload) * 8, cambios))
+                print(f"{f'#{i} ({len(mensaje)})':>10} {modo:>10} {len(payload) * 8:>10} {cambios:>16}")
+        return resultados
+    
+    def ocultar_mensaje_huffman(self, image_path, mensaje, output_path, channel=0, modo=None):
+        # modo: 'orden0', 'orden1' o 'palabras'; None = el que cambie menos LSB de esta imagen
         try:
             if not self.load_image(image_path):
                 return False
+            if not mensaje:
+                print("Error: El mensaje está vacío")
+                return False
+            if modo not in (None, 'orden0', 'orden1', 'palabras'):
+                print(f"Error: Modo desconocido '{modo}' (usa 'orden0', 'orden1' o 'palabras')")
+                return False
             print(f"\nOcultando mensaje con Huffman...")
             print(f"Mensaje original: '{mensaje}'")
             print(f"Longitud: {len(mensaje)} caracteres")
             
-            texto_binario, tabla, stats = self.huffman.codificar_texto(mensaje)
-            print(f"\nCompresión Huffman:")
+            canal = self.image[:, :, channel]
+            lsb_canal = canal.reshape(-1) & 1
+            candidatos = self.payloads_huffman(mensaje, modo)
+            cambios = []
+            for modo_cand, payload, _, _ in candidatos:
+                cambios.append(self._lsb_modificados(lsb_canal, payload))
+                print(f"Modo {modo_cand}: {len(payload) * 8} bits, {cambios[-1]} LSB modificados")
+            modo_usado, payload, tabla, stats = candidatos[int(np.argmin(cambios))]
+            
+            print(f"\nCompresión Huffman ({modo_usado}):")
             print(f"  - Cantidad de bits originales: {stats['longitud_original_bits']}")
             print(f"  - Bits comprimidos: {stats['longitud_comprimida_bits']}")
             print(f"  - Ahorro: {stats['ahorro_porcentual']:.1f}%")
+            if modo_usado == 'orden1':
+                print(f"  - Contextos con tabla propia: {stats['contextos']} (podados: {stats['contextos_podados']})")
+                print(f"  - Bits ahorrados frente a orden 0 (con tablas): {stats['bits_ahorrados_vs_orden0']}")
+            elif modo_usado == 'palabras':
+                print(f"  - Vocabulario: {stats['vocabulario']} tokens ({stats['bits_vocabulario']} bits), "
+                      f"escapados: {stats['tokens_escapados']}")
             
-            tabla_json = self.huffman.serializar_tabla(tabla)
-            len_tabla = len(tabla_json)
-            len_mensaje = len(texto_binario)
-            cabecera = f"{len_tabla:08d}{tabla_json}{len_mensaje:08d}"
-            
-            mensaje_chars = ""
-            for i in range(0, len(texto_binario), 8):
-                byte = texto_binario[i:i+8]
-                if len(byte) < 8:
-                    byte = byte.ljust(8, '0')
-                mensaje_chars += chr(int(byte, 2))
+            _, _, inicio_datos = self.huffman.leer_cabecera_payload(payload)
+            cabecera_json = 16 + len(self.huffman.serializar_tabla(tabla)) + 3
+            print(f"  - Cabecera binaria: {(inicio_datos + 4) * 8} bits (formato JSON: {cabecera_json * 8} bits)")
             
-            payload_completo = cabecera + mensaje_chars + "END"
-            bits_totales = ''.join(format(ord(c), '08b') for c in payload_completo)
+            bits_totales = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
             print(f"\nBits totales: {len(bits_totales)} bits ")
             
-            canal = self.image[:, :, channel]
             capacidad = canal.size
             if len(bits_totales) > capacidad:
                 print(f"Error: Mensaje muy grande ({len(bits_totales)} bits > {capacidad} píxeles)")
                 return False
             
             img_stego = self.image.copy()
-            bit_idx = 0
-            for i in range(canal.shape[0]):
-                for j in range(canal.shape[1]):
-                    if bit_idx < len(bits_totales):
-                        img_stego[i, j, channel] = (img_stego[i, j, channel] & 0xFE) | int(bits_totales[bit_idx])
-                        bit_idx += 1
-                    else:
-                        break
+            img_stego = EsteganografiaLSB._incrustar_bits(img_stego, bits_totales, channel)
             
             img_bgr = cv2.cvtColor(img_stego, cv2.COLOR_RGB2BGR)
             cv2.imwrite(output_path, img_bgr)
@@ -251,101 +768,233 @@ class LSBDetector:
             print(f"Extrayendo bits (canal {channel}) con {metodo}...")
             
             inicio = time.time()
-            if metodo == 'divide_y_venceras':
-                bits_lsb = self._lsb_bits_divide_and_conquer(canal)
-            else:
-                bits_lsb = self._lsb_bits_brute(canal)
+            bits_lsb, _ = self._extraer_bits(canal, metodo)
             tiempo = time.time() - inicio
             print(f"Tiempo: {tiempo:.5f} s")
             
-            mensaje_raw = ""
-            for i in range(0, len(bits_lsb), 8):
-                byte = bits_lsb[i:i+8]
-                if len(byte) < 8:
-                    break
-                mensaje_raw += chr(int(''.join(byte), 2))
-                if mensaje_raw.endswith("END"):
-                    mensaje_raw = mensaje_raw[:-3]
-                    break
-            
-            if len(mensaje_raw) < 16:
-                print("Datos insuficientes")
-                return None, None
-            
-            try:
-                len_tabla = int(mensaje_raw[:8])
-                tabla_json = mensaje_raw[8:8+len_tabla]
-                len_msg = int(mensaje_raw[8+len_tabla:16+len_tabla])
-            except (ValueError, IndexError):
-                print("Formato inválido")
-                return None, None
-            
+            datos = self._bits_a_bytes(bits_lsb)
+            if not datos.startswith(MAGIAS_HUFFMAN):
+                fin = datos.find(b"END")
+                if fin != -1:
+                    datos = datos[:fin]
+            return self._decodificar_payload_huffman(datos)
+        except Exception as e:
+            print(f"Error: {e}")
+            import traceback
+            traceback.print_exc()
+            return None, None
+
+    def _decodificar_payload_huffman(self, datos):
+        if datos.startswith(MAGIAS_HUFFMAN):
             try:
-                tabla = json.loads(tabla_json)
-            except json.JSONDecodeError:
-                print("Tabla JSON corrupta")
+                mensaje, tabla = self.huffman.desempaquetar_payload(datos)
+            except (ValueError, IndexError) as e:
+                print(f"Payload binario inválido: {e}")
                 return None, None
-            
-            inicio_datos = 16 + len_tabla
-            bits_huffman = ''.join(format(ord(c), '08b') for c in mensaje_raw[inicio_datos:])
-            bits_huffman = bits_huffman[:len_msg]
-            mensaje = self.huffman.decodificar_texto(bits_huffman, tabla)
-            
             if mensaje:
-                print(f"Mensaje Huffman recuperado correctamente")
+                print(f"Mensaje Huffman recuperado correctamente (formato binario)")
                 print(f"Caracteres únicos en tabla: {len(tabla)}")
             return mensaje, tabla
+        
+        # formato anterior: longitudes decimales, tabla JSON y terminador END
+        mensaje_raw = datos.decode('latin-1')
+        
+        if len(mensaje_raw) < 16:
+            print("Datos insuficientes")
+            return None, None
+        
+        try:
+            len_tabla = int(mensaje_raw[:8])
+            tabla_json = mensaje_raw[8:8+len_tabla]
+            len_msg = int(mensaje_raw[8+len_tabla:16+len_tabla])
+        except (ValueError, IndexError):
+            print("Formato inválido")
+            return None, None
+        
+        try:
+            tabla = json.loads(tabla_json)
+        except json.JSONDecodeError:
+            print("Tabla JSON corrupta")
+            return None, None
+        
+        inicio_datos = 16 + len_tabla
+        bits_huffman = ''.join(format(ord(c), '08b') for c in mensaje_raw[inicio_datos:])
+        bits_huffman = bits_huffman[:len_msg]
+        mensaje = self.huffman.decodificar_texto(bits_huffman, tabla)
+        
+        if mensaje:
+            print(f"Mensaje Huffman recuperado correctamente")
+            print(f"Caracteres únicos en tabla: {len(tabla)}")
+        return mensaje, tabla
+
+    def _bytes_lsb_stream(self, canal, filas_bloque=64):
+        # generador: empaqueta el plano LSB por bloques de filas; los bits que
+        # no completan un byte se arrastran al siguiente bloque
+        resto = np.empty(0, dtype=np.uint8)
+        for i in range(0, canal.shape[0], filas_bloque):
+            bloque = canal[i:i+filas_bloque]
+            bits = np.concatenate((resto, bloque.reshape(-1) & 1))
+            corte = len(bits) - len(bits) % 8
+            resto = bits[corte:]
+            yield np.packbits(bits[:corte]).tobytes(), bloque.size
+
+    def _longitud_payload(self, datos):
+        # bytes necesarios para completar el payload (incluye "END" o el CRC),
+        # o None si todavia no se puede saber
+        if datos.startswith(MAGIAS_HUFFMAN):
+            try:
+                return self.huffman.longitud_payload(datos)
+            except IndexError:
+                return None
+            except ValueError:
+                return len(datos)
+        if len(datos) >= 8 and datos[:8].isdigit():
+            len_tabla = int(datos[:8])
+            if len(datos) < 16 + len_tabla:
+                return None
+            campo_msg = datos[8+len_tabla:16+len_tabla]
+            if not campo_msg.isdigit():
+                return len(datos)
+            len_msg = int(campo_msg)
+            return 16 + len_tabla + (len_msg + 7) // 8 + 3
+        fin = datos.find(b"END")
+        if fin != -1:
+            return fin + 3
+        no_imprimible = re.search(rb'[^\x20-\x7e]', datos)
+        return no_imprimible.start() if no_imprimible else None
+
+    def extraer_mensaje_stream(self, image_path, channel=0, filas_bloque=64, solo_confirmado=False):
+        # solo_confirmado: el texto plano solo cuenta si aparece END; los payloads
+        # binarios ya se validan con su CRC y los anteriores con su cabecera
+        try:
+            if not self.load_image(image_path):
+                return None, None, 0
+            canal = self.image[:, :, channel]
+            print(f"Extrayendo por bloques de {filas_bloque} filas (canal {channel})...")
+            
+            inicio = time.time()
+            datos = bytearray()
+            pixeles = 0
+            total = None
+            for bloque, n in self._bytes_lsb_stream(canal, filas_bloque):
+                datos += bloque
+                pixeles += n
+                total = self._longitud_payload(datos)
+                if total is not None and len(datos) >= total:
+                    break
+            tiempo = time.time() - inicio
+            print(f"Tiempo: {tiempo:.5f} s")
+            print(f"Píxeles leídos: {pixeles} de {canal.size} ({pixeles / canal.size * 100:.2f}%)")
+            
+            datos = bytes(datos[:total]) if total is not None else bytes(datos)
+            if datos.startswith(MAGIAS_HUFFMAN):
+                mensaje, tabla = self._decodificar_payload_huffman(datos)
+                return mensaje, tabla, pixeles
+            if datos[:8].isdigit():
+                if datos.endswith(b"END"):
+                    datos = datos[:-3]
+                mensaje, tabla = self._decodificar_payload_huffman(datos)
+                return mensaje, tabla, pixeles
+            return self._bits_to_text(datos, solo_confirmado), None, pixeles
         except Exception as e:
             print(f"Error: {e}")
             import traceback
             traceback.print_exc()
-            return None, None
+            return None, None, 0
 
     def chi_square_test(self, channel_data_flat):
-        pairs_observed = []
-        pairs_expected = []
-        for i in range(0, 256, 2):
-            if i + 1 < 256:
-                even_count = np.sum(channel_data_flat == i)
-                odd_count = np.sum(channel_data_flat == i + 1)
-                pairs_observed.extend([even_count, odd_count])
-                expected = (even_count + odd_count) / 2
-                pairs_expected.extend([expected, expected])
-        pairs_observed = np.array(pairs_observed)
-        pairs_expected = np.array(pairs_expected)
+        return self.chi_square_test_hist(np.bincount(channel_data_flat, minlength=256))
+
+    def chi_square_test_hist(self, histograma):
+        # pares de valores (2k, 2k+1) a partir de un histograma de 256 posiciones
+        pairs_observed = histograma[:256].astype(np.float64)
+        pairs_expected = np.repeat((pairs_observed[0::2] + pairs_observed[1::2]) / 2, 2)
         mask = pairs_expected > 0
         chi2 = np.sum((pairs_observed[mask] - pairs_expected[mask])**2 / pairs_expected[mask])
-        df = len(pairs_observed[mask]) - 1
+        df = int(np.count_nonzero(mask)) - 1
         p_value = 1 - stats.chi2.cdf(chi2, df) if df > 0 else 1
         return chi2, p_value, df
 
-    def lsb_analysis(self, channel_flat):
+    def ataque_chi_cuadrado(self, channel_2d, paso=None, umbral=0.5):
+        # ataque de Westfeld-Pfitzmann: p-valor sobre prefijos crecientes del flujo de
+        # pixeles; el histograma se actualiza solo con los pixeles nuevos de cada paso
+        flat = channel_2d.reshape(-1)
+        n = flat.size
+        if paso is None:
+            paso = max(128, n // 1000)
+        histograma = np.zeros(256, dtype=np.int64)
+        posiciones = []
+        p_valores = []
+        for inicio in range(0, n, paso):
+            histograma += np.bincount(flat[inicio:inicio+paso], minlength=256)
+            pares = histograma[0::2]
+            esperados = (histograma[0::2] + histograma[1::2]) / 2
+            mask = esperados > 4
+            df = int(np.count_nonzero(mask)) - 1
+            chi2 = np.sum((pares[mask] - esperados[mask])**2 / esperados[mask])
+            leidos = min(inicio + paso, n)
+            posiciones.append(leidos)
+            # la prueba no esta definida sin grados de libertad o si los pares con
+            # esperado > 4 no cubren ni la mitad de los pixeles leidos (primeros pasos
+            # de imagenes pequeñas); esos pasos quedan en nan y no cuentan como caida
+            definida = df > 0 and 2 * esperados[mask].sum() >= leidos / 2
+            p_valores.append(stats.chi2.sf(chi2, df) if definida else np.nan)
+        posiciones = np.array(posiciones)
+        p_valores = np.array(p_valores)
+        
+        # el mensaje ocupa el prefijo en el que el p-valor se mantiene alto: termina en
+        # el ultimo paso definido con p >= umbral, despues del cual ya no se recupera.
+        # Asi una caida aislada con pocas muestras al inicio no corta la estimacion
+        definidos = np.flatnonzero(~np.isnan(p_valores))
+        arriba = definidos[p_valores[definidos] >= umbral]
+        longitud = int(posiciones[arriba[-1]]) if len(arriba) else 0
+        return {
+            'posiciones': posiciones,
+            'p_valores': p_valores,
+            'longitud_estimada_bits': longitud,
+            'longitud_estimada_bytes': longitud // 8,
+        }
+
+    def lsb_analysis(self, channel_flat, histograma=None):
         lsb_bits = channel_flat & 1
+        if histograma is None:
+            histograma = np.bincount(channel_flat, minlength=256)
+        # los LSB en 1 son exactamente los valores impares del histograma
+        unos = int(histograma[1::2].sum())
+        conteos = np.array([len(channel_flat) - unos, unos])
+        mean = unos / len(channel_flat) if len(channel_flat) else 0
         lsb_stats = {
-            'mean': np.mean(lsb_bits),
-            'variance': np.var(lsb_bits),
-            'entropy': self.calculate_entropy(lsb_bits),
+            'mean': mean,
+            'variance': mean * (1 - mean),
+            'entropy': self.calculate_entropy_counts(conteos),
             'runs_test': self.runs_test(lsb_bits),
             'expected_mean': 0.5,
             'expected_variance': 0.25
         }
         return lsb_stats
 
-    def calculate_entropy(self, data):
-        unique, counts = np.unique(data, return_counts=True)
-        probabilities = counts / len(data)
-        entropy = -np.sum(probabilities * np.log2(probabilities + 1e-10))
-        return entropy
+    def calculate_entropy_counts(self, counts):
+        counts = counts[counts > 0]
+        if len(counts) == 0:
+            return 0.0
+        probabilities = counts / counts.sum()
+        return -np.sum(probabilities * np.log2(probabilities + 1e-10))
 
-    def runs_test(self, binary_sequence):
+    def runs_test(self, binary_sequence, n_bits=None):
+        # acepta el arreglo de bits (uint8) o el buffer empaquetado de _lsb_bits_vectorizado
+        if isinstance(binary_sequence, (bytes, bytearray)):
+            binary_sequence = np.unpackbits(np.frombuffer(binary_sequence, dtype=np.uint8), count=n_bits)
+        binary_sequence = np.asarray(binary_sequence, dtype=np.uint8)
         n = len(binary_sequence)
         if n == 0:
             return 0, 1
-        runs = 1
-        for i in range(1, n):
-            if binary_sequence[i] != binary_sequence[i-1]:
-                runs += 1
-        ones = np.sum(binary_sequence)
+        # cada cambio entre bits consecutivos abre una nueva racha
+        runs = int(np.count_nonzero(np.diff(binary_sequence))) + 1
+        ones = int(np.count_nonzero(binary_sequence))
+        return self._runs_z_score(runs, ones, n)
+
+    def _runs_z_score(self, runs, ones, n):
+        # enteros de Python: con n grande el producto desborda en uint64
         zeros = n - ones
         if ones == 0 or zeros == 0:
             return runs, 1
@@ -379,6 +1028,103 @@ class LSBDetector:
             score += weights['correlation']
         return min(score, 1.0)
 
+    def _chi_pares(self, histogramas):
+        # chi cuadrado y p-valor de que cada par (2k, 2k+1) este igualado, un histograma
+        # por fila. Cada par aporta (par - impar)^2 / (par + impar) con un grado de
+        # libertad, asi que en un bloque con LSB aleatorio el p-valor es uniforme y en
+        # uno limpio queda cerca de 0. Solo cuentan los pares con esperado > 4; un
+        # bloque sin pares suficientes no se puede probar y queda con p = 0
+        pares = histogramas[:, 0::2].astype(np.float64)
+        impares = histogramas[:, 1::2].astype(np.float64)
+        total = pares + impares
+        mask = total > 8
+        chi2 = np.where(mask, (pares - impares) ** 2 / np.where(mask, total, 1), 0).sum(axis=1)
+        df = mask.sum(axis=1)
+        return chi2, np.where(df > 0, stats.chi2.sf(chi2, np.maximum(df, 1)), 0.0)
+
+    def puntaje_bloques(self, p_chi, media_lsb, n):
+        # en un bloque con LSB incrustado los pares (2k, 2k+1) quedan igualados, asi que
+        # el p-valor chi no es bajo (en un bloque limpio casi siempre lo es), y la
+        # media de LSB queda dentro del ruido de una moneda justa alrededor de 0.5.
+        # Cada senal vale 0.5, asi el umbral 0.6 pide las dos a la vez. La entropia
+        # de los LSB es funcion de esa misma media y la correlacion entre pixeles
+        # vecinos casi no cambia al tocar solo el LSB, asi que no entran al puntaje
+        pares_igualados = p_chi > 0.05
+        media_aleatoria = np.abs(media_lsb - 0.5) < 3 * 0.5 / np.sqrt(n)
+        return 0.5 * pares_igualados + 0.5 * media_aleatoria
+
+    def analisis_por_bloques(self, channel_2d, tam_bloque=64, umbral=0.6):
+        # mapa de sospecha por bloques de tam_bloque x tam_bloque; se recorre una franja
+        # de bloques a la vez usando vistas (reshape) del canal, sin copiar cada bloque
+        h, w = channel_2d.shape
+        filas, columnas = h // tam_bloque, w // tam_bloque
+        n = tam_bloque * tam_bloque
+        chi2 = np.zeros((filas, columnas))
+        p_chi = np.ones((filas, columnas))
+        media_lsb = np.zeros((filas, columnas))
+        entropia = np.zeros((filas, columnas))
+        correlacion = np.zeros((filas, columnas))
+        indices = (np.arange(columnas, dtype=np.int32) * 256)[None, :, None]
+        
+        for f in range(filas):
+            franja = channel_2d[f*tam_bloque:(f+1)*tam_bloque, :columnas*tam_bloque]
+            franja = franja.reshape(tam_bloque, columnas, tam_bloque)
+            
+            # un histograma de 256 valores por bloque con un solo bincount
+            histogramas = np.bincount((indices + franja).ravel(),
+                                      minlength=columnas * 256).reshape(columnas, 256)
+            unos = histogramas[:, 1::2].sum(axis=1)
+            chi2[f], p_chi[f] = self._chi_pares(histogramas)
+            
+            hc = self._correlacion_bloques(franja[:, :, :-1], franja[:, :, 1:], axis=(0, 2))
+            vc = self._correlacion_bloques(franja[:-1], franja[1:], axis=(0, 2))
+            
+            for c in range(columnas):
+                media_lsb[f, c] = unos[c] / n
+                entropia[f, c] = self.calculate_entropy_counts(np.array([n - unos[c], unos[c]]))
+                correlacion[f, c] = (abs(hc[c]) + abs(vc[c])) / 2
+        
+        mapa = self.puntaje_bloques(p_chi, media_lsb, n)
+        region = self._region_sospechosa(mapa >= umbral, tam_bloque)
+        return {
+            'mapa': mapa,
+            'chi2': chi2,
+            'p_chi': p_chi,
+            'media_lsb': media_lsb,
+            'entropia': entropia,
+            'correlacion': correlacion,
+            'tam_bloque': tam_bloque,
+            'region': region,
+        }
+
+    def _region_sospechosa(self, sospechosos, tam_bloque, fraccion=0.5):
+        # filas y columnas de bloques donde al menos la mitad de los bloques son
+        # sospechosos; los falsos positivos sueltos de una imagen limpia no alcanzan
+        # esa fraccion y no estiran la region como lo haria la caja de todos ellos
+        if not sospechosos.size:
+            return None
+        filas = np.flatnonzero(sospechosos.mean(axis=1) >= fraccion)
+        if not len(filas):
+            return None
+        f0, f1 = filas.min(), filas.max()
+        columnas = np.flatnonzero(sospechosos[f0:f1+1].mean(axis=0) >= fraccion)
+        if not len(columnas):
+            return None
+        c0, c1 = columnas.min(), columnas.max()
+        return (int(f0 * tam_bloque), int(c0 * tam_bloque),
+                int((f1 + 1) * tam_bloque), int((c1 + 1) * tam_bloque))
+
+    def _correlacion_bloques(self, x, y, axis):
+        # coeficiente de Pearson por bloque a partir de sumas (equivale a np.corrcoef)
+        x = x.astype(np.float64)
+        y = y.astype(np.float64)
+        n = x.shape[axis[0]] * x.shape[axis[1]]
+        sx, sy = x.sum(axis=axis), y.sum(axis=axis)
+        sxy = (x * y).sum(axis=axis)
+        sxx, syy = (x * x).sum(axis=axis), (y * y).sum(axis=axis)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (n * sxy - sx * sy) / np.sqrt((n * sxx - sx**2) * (n * syy - sy**2))
+
     def analizar_imagen_completo(self, image_path):
         print(f"\nANÁLISIS COMPLETO DE: {os.path.basename(image_path)}")
         print("="*60)
@@ -392,8 +1138,10 @@ class LSBDetector:
         mensaje_fb = self.extraer_mensaje_lsb(image_path, 'fuerza_bruta')
         print("\nMétodo Divide y Vencerás:")
         mensaje_dyv = self.extraer_mensaje_lsb(image_path, 'divide_y_venceras')
+        print("\nMétodo Vectorizado:")
+        mensaje_vec = self.extraer_mensaje_lsb(image_path, 'vectorizado')
         
-        mensaje_estandar = mensaje_fb or mensaje_dyv
+        mensaje_estandar = mensaje_fb or mensaje_dyv or mensaje_vec
         if mensaje_estandar:
             print(f"\nMENSAJE ESTÁNDAR ENCONTRADO: '{mensaje_estandar}'")
         else:
@@ -404,26 +1152,38 @@ class LSBDetector:
         mensaje_huff_fb, tabla_fb = self.extraer_mensaje_huffman(image_path, 'fuerza_bruta', 0)
         print("\nMétodo Divide y Vencerás:")
         mensaje_huff_dyv, tabla_dyv = self.extraer_mensaje_huffman(image_path, 'divide_y_venceras', 0)
+        print("\nMétodo Vectorizado:")
+        mensaje_huff_vec, tabla_vec = self.extraer_mensaje_huffman(image_path, 'vectorizado', 0)
         
-        mensaje_huffman = mensaje_huff_fb or mensaje_huff_dyv
+        mensaje_huffman = mensaje_huff_fb or mensaje_huff_dyv or mensaje_huff_vec
         if mensaje_huffman:
             print(f"\nMENSAJE HUFFMAN ENCONTRADO: '{mensaje_huffman}'")
         else:
             print("\nNo se encontró mensaje Huffman")
         
         print("\n---- ANÁLISIS ESTADÍSTICO (Canal Rojo) ----")
-        channel = self.image[:, :, 0]
-        flat = channel.flatten()
-        chi2, pchi, df = self.chi_square_test(flat)
-        lsb_stats = self.lsb_analysis(flat)
-        hc, vc = self.spatial_correlation_analysis(channel)
-        suspicion = self.calculate_suspicion_score(pchi, lsb_stats, hc, vc)
+        chi2, pchi, df, lsb_stats, hc, vc, suspicion = self.analisis_estadistico(self.image[:, :, 0])
         
         print(f"Chi cuadrado: {chi2:.3f}, p-valor={pchi:.5f}, df={df}")
         print(f"LSB: mean={lsb_stats['mean']:.3f}, var={lsb_stats['variance']:.3f}, entropía={lsb_stats['entropy']:.3f}")
         print(f"Correlación espacial: horizontal={hc:.3f}, vertical={vc:.3f}")
         print(f"Puntuación de sospecha: {suspicion:.2f}/1.0")
         
+        ataque = self.ataque_chi_cuadrado(self.image[:, :, 0])
+        p_definidos = ataque['p_valores'][~np.isnan(ataque['p_valores'])]
+        p_inicial = p_definidos[0] if len(p_definidos) else float('nan')
+        print(f"Ataque χ² secuencial: p-valor inicial={p_inicial:.4f}, "
+              f"longitud estimada={ataque['longitud_estimada_bits']} bits (~{ataque['longitud_estimada_bytes']} bytes)")
+        
+        bloques = self.analisis_por_bloques(self.image[:, :, 0])
+        mapa = bloques['mapa']
+        if mapa.size:
+            print(f"Bloques {bloques['tam_bloque']}x{bloques['tam_bloque']}: {mapa.shape[0]}x{mapa.shape[1]}, "
+                  f"sospecha máxima={mapa.max():.2f}, bloques sospechosos={int((mapa >= 0.6).sum())}")
+            if bloques['region']:
+                y0, x0, y1, x1 = bloques['region']
+                print(f"Región estimada: filas {y0}-{y1}, columnas {x0}-{x1}")
+        
         if mensaje_estandar or mensaje_huffman:
             print("\nEstado: ESTEGANOGRAFÍA DETECTADA")
         elif suspicion > 0.4:
@@ -432,8 +1192,123 @@ class LSBDetector:
             print("\nEstado: NORMAL - No se detectó esteganografía")
 
 
+    def analisis_estadistico(self, channel):
+        flat = channel.flatten()
+        # un solo histograma compartido por la prueba chi cuadrado y el analisis LSB
+        histograma = np.bincount(flat, minlength=256)
+        chi2, pchi, df = self.chi_square_test_hist(histograma)
+        lsb_stats = self.lsb_analysis(flat, histograma)
+        hc, vc = self.spatial_correlation_analysis(channel)
+        suspicion = self.calculate_suspicion_score(pchi, lsb_stats, hc, vc)
+        return chi2, pchi, df, lsb_stats, hc, vc, suspicion
+
+    def resultado_imagen(self, image_path):
+        # version sin impresion de analizar_imagen_completo, para el modo por lotes
+        resultado = {campo: None for campo in CAMPOS_LOTE}
+        resultado['ruta'] = image_path
+        try:
+            with redirect_stdout(io.StringIO()):
+                mensaje, _, pixeles = self.extraer_mensaje_stream(image_path, solo_confirmado=True)
+            if self.image is None:
+                resultado['error'] = "No se pudo cargar la imagen"
+                return resultado
+            chi2, pchi, df, lsb_stats, hc, vc, suspicion = self.analisis_estadistico(self.image[:, :, 0])
+            rachas_z, rachas_p = lsb_stats['runs_test']
+            resultado.update({
+                'chi2': float(chi2),
+                'p_valor': float(pchi),
+                'entropia': float(lsb_stats['entropy']),
+                'media_lsb': float(lsb_stats['mean']),
+                'rachas_z': float(rachas_z),
+                'rachas_p': float(rachas_p),
+                'corr_horizontal': float(hc),
+                'corr_vertical': float(vc),
+                'sospecha': float(suspicion),
+                'mensaje': mensaje,
+                'pixeles_leidos': int(pixeles),
+            })
+        except Exception as e:
+            resultado['error'] = str(e)
+        return resultado
+
+    def analizar_lote(self, paths, workers=None, salida=None):
+        rutas = buscar_imagenes(paths)
+        if not rutas:
+            print("No se encontraron imágenes")
+            return []
+        print(f"Analizando {len(rutas)} imágenes con {workers or os.cpu_count()} procesos...")
+        
+        resultados = []
+        archivo = open(salida, 'w', newline='', encoding='utf-8') if salida else None
+        escritor = None
+        if archivo and salida.lower().endswith('.csv'):
+            escritor = csv.DictWriter(archivo, fieldnames=CAMPOS_LOTE)
+            escritor.writeheader()
+        
+        inicio = time.time()
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(rutas) // ((workers or os.cpu_count() or 1) * 8))
+                for resultado in pool.map(_analizar_imagen_lote, rutas, chunksize=chunksize):
+                    resultados.append(resultado)
+                    if escritor:
+                        escritor.writerow(resultado)
+                    elif archivo:
+                        archivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        finally:
+            if archivo:
+                archivo.close()
+        tiempo = time.time() - inicio
+        
+        sospechosas = sum(1 for r in resultados if r['mensaje'] is not None or (r['sospecha'] or 0) > 0.4)
+        errores = sum(1 for r in resultados if r['error'])
+        print(f"Imágenes analizadas: {len(resultados)} en {tiempo:.2f} s "
+              f"({len(resultados) / tiempo if tiempo > 0 else 0:.1f} imágenes/s)")
+        print(f"Sospechosas o con mensaje: {sospechosas} | Errores: {errores}")
+        if salida:
+            print(f"Resultados guardados en: {salida}")
+        return resultados
+
+
+def _analizar_imagen_lote(image_path):
+    # cada proceso del pool crea su propio detector
+    return LSBDetector().resultado_imagen(image_path)
+
+
+def buscar_imagenes(paths):
+    imagenes = []
+    for ruta in paths:
+        if os.path.isdir(ruta):
+            for ext in EXTENSIONES_IMAGEN:
+                imagenes.extend(glob.glob(os.path.join(ruta, '**', ext), recursive=True))
+        else:
+            imagenes.extend(glob.glob(ruta))
+    return sorted(dict.fromkeys(imagenes))
+
+
 class EsteganografiaLSB:
     
+    @staticmethod
+    def _texto_a_bits(texto):
+        # mismo resultado que ''.join(format(ord(c), '08b') for c in texto) como arreglo uint8
+        try:
+            return np.unpackbits(np.frombuffer(texto.encode('latin-1'), dtype=np.uint8))
+        except UnicodeEncodeError:
+            # caracteres fuera de latin-1 ocupan mas de 8 bits con format(..., '08b')
+            bits = ''.join(format(ord(c), '08b') for c in texto)
+            return np.frombuffer(bits.encode('ascii'), dtype=np.uint8) - ord('0')
+
+    @staticmethod
+    def _incrustar_bits(imagen, bits, channel=0):
+        # reshape solo devuelve una vista si la imagen es contigua; si no (recortes,
+        # canales invertidos) se escribiria en una copia, asi que se fuerza contigua
+        # y se devuelve la imagen que realmente se modifico
+        imagen = np.ascontiguousarray(imagen)
+        # la vista (pixeles, canales) recorre la imagen por filas, igual que los ciclos anidados
+        pixeles = imagen.reshape(-1, imagen.shape[2])
+        pixeles[:len(bits), channel] = (pixeles[:len(bits), channel] & 0xFE) | bits
+        return imagen
+
     @staticmethod
     def crear_imagen_con_mensaje(mensaje, nombre_archivo="imagen_con_mensaje.png"):
         try:
@@ -441,20 +1316,13 @@ class EsteganografiaLSB:
             imagen = np.random.randint(50, 200, (height, width, 3), dtype=np.uint8)
             
             mensaje_con_fin = mensaje + "END"
-            mensaje_binario = ''.join(format(ord(c), '08b') for c in mensaje_con_fin)
+            mensaje_binario = EsteganografiaLSB._texto_a_bits(mensaje_con_fin)
             
             if len(mensaje_binario) > width * height:
                 print("Mensaje demasiado largo")
                 return False
             
-            bit_index = 0
-            for i in range(height):
-                for j in range(width):
-                    if bit_index < len(mensaje_binario):
-                        imagen[i, j, 0] = (imagen[i, j, 0] & 0xFE) | int(mensaje_binario[bit_index])
-                        bit_index += 1
-                    else:
-                        break
+            imagen = EsteganografiaLSB._incrustar_bits(imagen, mensaje_binario, 0)
             
             Image.fromarray(imagen).save(nombre_archivo)
             print(f"Imagen creada: {nombre_archivo}")
@@ -477,20 +1345,13 @@ class EsteganografiaLSB:
             height, width, _ = imagen.shape
             
             mensaje_con_fin = mensaje + "END"
-            mensaje_binario = ''.join(format(ord(c), '08b') for c in mensaje_con_fin)
+            mensaje_binario = EsteganografiaLSB._texto_a_bits(mensaje_con_fin)
             
             if len(mensaje_binario) > width * height:
                 print("Mensaje demasiado largo")
                 return False
             
-            bit_index = 0
-            for i in range(height):
-                for j in range(width):
-                    if bit_index < len(mensaje_binario):
-                        imagen[i, j, 0] = (imagen[i, j, 0] & 0xFE) | int(mensaje_binario[bit_index])
-                        bit_index += 1
-                    else:
-                        break
+            imagen = EsteganografiaLSB._incrustar_bits(imagen, mensaje_binario, 0)
             
             Image.fromarray(imagen).save(imagen_salida)
             print(f"Mensaje oculto en: {imagen_salida}")
@@ -505,7 +1366,7 @@ def mostrar_menu():
     print("\n" + "="*60)
     print(" DETECTOR LSB ")
     print("="*60)
-    print("1. Analizar imagen (FB + DyV + Huffman)")
+    print("1. Analizar imagen (FB + DyV + Vectorizado + Huffman)")
     print("2. Crear imagen con mensaje estándar")
     print("3. Ocultar mensaje estándar en imagen existente")
     print("4. Ocultar mensaje con Huffman en imagen existente")
@@ -514,10 +1375,9 @@ def mostrar_menu():
 
 
 def seleccionar_imagen():
-    extensiones = ['*.jpg', '*.jpeg', '*.png', '*.bmp', '*.tiff']
     imagenes = []
     
-    for ext in extensiones:
+    for ext in EXTENSIONES_IMAGEN:
         imagenes.extend(glob.glob(ext))
     
     imagenes = list(dict.fromkeys(imagenes))
@@ -584,8 +1444,34 @@ def main():
             print("Opción no válida. Intenta de nuevo.")
 
 
+def main_cli(argv):
+    parser = argparse.ArgumentParser(prog="huffman.py",
+                                     description="Detector LSB (sin argumentos abre el menú interactivo)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_lote = sub.add_parser("lote", help="Análisis forense por lotes de imágenes")
+    p_lote.add_argument('rutas', nargs='+', help="Imágenes, patrones glob o carpetas")
+    p_lote.add_argument('-w', '--workers', type=int, default=None, help="Número de procesos")
+    p_lote.add_argument('-o', '--salida', default=None, help="Archivo de resultados (.jsonl o .csv)")
+    p_modos = sub.add_parser("comparar_modos", help="LSB modificados por cada modo Huffman en una imagen")
+    p_modos.add_argument('imagen')
+    p_modos.add_argument('mensajes', nargs='+', help="Archivos de texto con los mensajes")
+    args = parser.parse_args(argv)
+
+    if args.comando == "lote":
+        LSBDetector().analizar_lote(args.rutas, workers=args.workers, salida=args.salida)
+    else:
+        mensajes = []
+        for ruta in args.mensajes:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                mensajes.append(f.read())
+        LSBDetector().comparar_modos_payload(args.imagen, mensajes)
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main_cli(sys.argv[1:])
+        sys.exit(0)
     print("\n" + "="*60)
     print(" DETECTOR DE ESTEGANOGRAFÍA LSB")
     print("="*60)
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,159 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+from scipy import stats
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, DIR)
+
+from huffman import EsteganografiaLSB, LSBDetector
+
+RUTA_RECETA = os.path.join(DIR, "..", "..", "1.Practica", "Foto de la receta", "Receta_P1_ValenciaJennifer.jpg")
+
+
+@pytest.fixture(scope="module")
+def canal_receta():
+    imagen = cv2.imread(RUTA_RECETA)
+    if imagen is None:
+        pytest.skip("no se encontro la imagen de la receta")
+    return imagen[:, :, 2].copy()
+
+
+def incrustar_lsb_aleatorio(canal, filas, semilla=0):
+    # LSB aleatorios en las primeras filas, como un payload cifrado o comprimido
+    rng = np.random.default_rng(semilla)
+    canal = canal.copy()
+    canal[:filas] = (canal[:filas] & 0xFE) | rng.integers(0, 2, canal[:filas].shape, dtype=np.uint8)
+    return canal
+
+
+def test_bloques_imagen_limpia_sin_region(canal_receta):
+    assert LSBDetector().analisis_por_bloques(canal_receta)['region'] is None
+
+
+@pytest.mark.parametrize("fraccion", [0.1, 0.3, 0.6])
+def test_bloques_region_cubre_franja_incrustada(canal_receta, fraccion):
+    h, w = canal_receta.shape
+    filas = int(h * fraccion)
+    resultado = LSBDetector().analisis_por_bloques(incrustar_lsb_aleatorio(canal_receta, filas))
+    tam = resultado['tam_bloque']
+    y0, x0, y1, x1 = resultado['region']
+    assert y0 == 0 and x0 == 0
+    # la region llega al bloque que contiene la ultima fila incrustada y no mas alla
+    assert filas <= y1 <= filas + tam
+    assert x1 >= (w // tam - 1) * tam
+
+
+def test_ataque_chi_imagen_pequena_aleatoria():
+    # con pocas muestras por paso la prueba no esta definida al principio; eso no
+    # debe contar como caida del p-valor
+    canal = np.random.default_rng(0).integers(0, 256, (300, 400), dtype=np.uint8)
+    ataque = LSBDetector().ataque_chi_cuadrado(canal)
+    assert ataque['longitud_estimada_bits'] == canal.size
+
+
+def test_ataque_chi_imagen_pequena_mitad_incrustada(canal_receta):
+    canal = canal_receta[600:900, 1000:1200]
+    bits = canal.size // 2
+    plano = canal.reshape(-1).copy()
+    plano[:bits] = (plano[:bits] & 0xFE) | np.random.default_rng(1).integers(0, 2, bits, dtype=np.uint8)
+    detector = LSBDetector()
+    estimado = detector.ataque_chi_cuadrado(plano.reshape(canal.shape))['longitud_estimada_bits']
+    assert bits <= estimado < canal.size
+    assert detector.ataque_chi_cuadrado(canal.copy())['longitud_estimada_bits'] < canal.size // 10
+
+
+def test_incrustar_bits_en_imagen_no_contigua():
+    # un recorte con canales invertidos no es contiguo: reshape daria una copia
+    base = np.random.default_rng(2).integers(0, 256, (40, 60, 3), dtype=np.uint8)
+    imagen = base[5:25, 10:50, ::-1]
+    assert not imagen.flags['C_CONTIGUOUS']
+    bits = np.random.default_rng(3).integers(0, 2, 500, dtype=np.uint8)
+    resultado = EsteganografiaLSB._incrustar_bits(imagen, bits, 1)
+    assert np.array_equal(resultado.reshape(-1, 3)[:500, 1] & 1, bits)
+
+
+def test_lote_imagen_limpia_sin_mensaje(tmp_path):
+    # los LSB aleatorios empiezan con un byte imprimible; eso no es un mensaje
+    rng = np.random.default_rng(4)
+    while True:
+        imagen = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+        if 32 <= np.packbits(imagen[0, :8, 0] & 1)[0] <= 126:
+            break
+    ruta_limpia = str(tmp_path / "limpia.png")
+    cv2.imwrite(ruta_limpia, imagen[:, :, ::-1])
+    assert LSBDetector().resultado_imagen(ruta_limpia)['mensaje'] is None
+
+    ruta_mensaje = str(tmp_path / "mensaje.png")
+    assert EsteganografiaLSB.ocultar_mensaje_en_imagen_existente("hola", ruta_limpia, ruta_mensaje)
+    assert LSBDetector().resultado_imagen(ruta_mensaje)['mensaje'] == "hola"
+
+
+def rachas_bucle(bits):
+    # prueba de rachas original, bit a bit, como referencia para la vectorizada
+    n = len(bits)
+    if n == 0:
+        return 0, 1
+    runs = 1
+    for i in range(1, n):
+        if bits[i] != bits[i-1]:
+            runs += 1
+    ones = int(np.sum(bits))
+    zeros = n - ones
+    if ones == 0 or zeros == 0:
+        return runs, 1
+    expected_runs = (2 * ones * zeros) / n + 1
+    variance_runs = (2 * ones * zeros * (2 * ones * zeros - n)) / (n**2 * (n - 1))
+    if variance_runs <= 0:
+        return runs, 1
+    z_score = (runs - expected_runs) / np.sqrt(variance_runs)
+    return z_score, 2 * (1 - stats.norm.cdf(abs(z_score)))
+
+
+def plano_rachas(tipo):
+    plano = np.random.default_rng(5).integers(0, 256, (256, 256), dtype=np.uint8)
+    if tipo == "estego":
+        bits = np.unpackbits(np.frombuffer(b"mensaje de prueba" * 64 + b"END", dtype=np.uint8))
+        plano.reshape(-1)[:len(bits)] = (plano.reshape(-1)[:len(bits)] & 0xFE) | bits
+    return plano
+
+
+@pytest.mark.parametrize("tipo", ["aleatorio", "estego"])
+@pytest.mark.parametrize("empaquetado", [False, True])
+def test_rachas_vectorizada_igual_al_ciclo(tipo, empaquetado):
+    # un bit de menos para que el ultimo byte empaquetado quede incompleto
+    bits = (plano_rachas(tipo).reshape(-1) & 1)[:-1]
+    z_ref, p_ref = rachas_bucle(bits)
+    if empaquetado:
+        z, p = LSBDetector().runs_test(np.packbits(bits).tobytes(), n_bits=len(bits))
+    else:
+        z, p = LSBDetector().runs_test(bits)
+    assert np.isclose(z, z_ref)
+    assert np.isclose(p, p_ref)
+
+
+@pytest.fixture
+def imagen_aleatoria(tmp_path):
+    ruta = str(tmp_path / "portada.png")
+    cv2.imwrite(ruta, np.random.default_rng(6).integers(0, 256, (64, 64, 3), dtype=np.uint8))
+    return ruta
+
+
+def test_huffman_orden1_con_un_caracter_usa_orden0(imagen_aleatoria, tmp_path):
+    salida = str(tmp_path / "estego.png")
+    detector = LSBDetector()
+    assert detector.ocultar_mensaje_huffman(imagen_aleatoria, "a", salida, modo='orden1')
+    assert detector.extraer_mensaje_huffman(salida, 'vectorizado')[0] == "a"
+
+
+def test_huffman_mensaje_vacio_se_rechaza(imagen_aleatoria, tmp_path):
+    assert not LSBDetector().ocultar_mensaje_huffman(imagen_aleatoria, "", str(tmp_path / "estego.png"))
+
+
+def test_bloques_devuelve_chi2_por_bloque(canal_receta):
+    resultado = LSBDetector().analisis_por_bloques(canal_receta)
+    assert resultado['chi2'].shape == resultado['mapa'].shape
+    assert (resultado['chi2'] >= 0).all()
@@ -123,50 +123,53 @@ class LSBDetector:
     # PRUEBAS ESTADÍSTICAS
     # ---------------------------------------------------------------
     def prueba_chi_cuadrado(self, datos_canal_plano):
-        pares_observados = []
-        pares_esperados = []
-        for i in range(0, 256, 2):
-            if i + 1 < 256:
-                conteo_par = np.sum(datos_canal_plano == i)
-                conteo_impar = np.sum(datos_canal_plano == i + 1)
-                pares_observados.extend([conteo_par, conteo_impar])
-                esperado = (conteo_par + conteo_impar) / 2
-                pares_esperados.extend([esperado, esperado])
-        pares_observados = np.array(pares_observados)
-        pares_esperados = np.array(pares_esperados)
+        return self.prueba_chi_cuadrado_histograma(np.bincount(datos_canal_plano, minlength=256))
+
+    def prueba_chi_cuadrado_histograma(self, histograma):
+        """Chi cuadrado sobre pares (2k, 2k+1) a partir de un histograma ya calculado."""
+        pares_observados = histograma[:256].astype(np.float64)
+        pares_esperados = np.repeat((pares_observados[0::2] + pares_observados[1::2]) / 2, 2)
         mascara = pares_esperados > 0
         chi2 = np.sum((pares_observados[mascara] - pares_esperados[mascara])**2 / pares_esperados[mascara])
-        grados_libertad = len(pares_observados[mascara]) - 1
+        grados_libertad = int(np.count_nonzero(mascara)) - 1
         valor_p = 1 - stats.chi2.cdf(chi2, grados_libertad) if grados_libertad > 0 else 1
         return chi2, valor_p, grados_libertad
 
-    def analisis_lsb(self, canal_plano):
+    def analisis_lsb(self, canal_plano, histograma=None):
+        """Si se pasa el histograma de 256 valores ya calculado, media, varianza y
+        entropia de los LSB salen de sus conteos impares; solo la prueba de rachas
+        necesita la secuencia de bits."""
         bits_lsb = canal_plano & 1
+        if histograma is None:
+            histograma = np.bincount(canal_plano, minlength=256)
+        n = len(canal_plano)
+        unos = int(histograma[1::2].sum())
+        media = unos / n if n else 0.0
         estadisticas_lsb = {
-            'media': np.mean(bits_lsb),
-            'varianza': np.var(bits_lsb),
-            'entropia': self.calcular_entropia(bits_lsb),
+            'media': media,
+            'varianza': media * (1 - media),
+            'entropia': self.calcular_entropia_conteos(np.array([n - unos, unos])),
             'prueba_rachas': self.prueba_rachas(bits_lsb),
             'media_esperada': 0.5,
             'varianza_esperada': 0.25
         }
         return estadisticas_lsb
 
-    def calcular_entropia(self, datos):
-        unicos, conteos = np.unique(datos, return_counts=True)
-        probabilidades = conteos / len(datos)
-        entropia = -np.sum(probabilidades * np.log2(probabilidades + 1e-10))
-        return entropia
+    def calcular_entropia_conteos(self, conteos):
+        conteos = conteos[conteos > 0]
+        if len(conteos) == 0:
+            return 0.0
+        probabilidades = conteos / conteos.sum()
+        return -np.sum(probabilidades * np.log2(probabilidades + 1e-10))
 
     def prueba_rachas(self, secuencia_binaria):
         n = len(secuencia_binaria)
         if n == 0:
             return 0, 1
-        rachas = 1
-        for i in range(1, n):
-            if secuencia_binaria[i] != secuencia_binaria[i-1]:
-                rachas += 1
-        unos = np.sum(secuencia_binaria)
+        secuencia_binaria = np.asarray(secuencia_binaria, dtype=np.uint8)
+        # cada cambio entre bits consecutivos abre una nueva racha
+        rachas = int(np.count_nonzero(np.diff(secuencia_binaria))) + 1
+        unos = int(np.count_nonzero(secuencia_binaria))
         ceros = n - unos
         if unos == 0 or ceros == 0:
             return rachas, 1
@@ -222,8 +225,9 @@ class LSBDetector:
         print("\nANALISIS ESTADISTICO (Canal Rojo):")
         canal = self.imagen[:, :, 0]
         plano = canal.flatten()
-        chi2, valor_p_chi, grados_libertad = self.prueba_chi_cuadrado(plano)
-        estadisticas_lsb = self.analisis_lsb(plano)
+        histograma = np.bincount(plano, minlength=256)
+        chi2, valor_p_chi, grados_libertad = self.prueba_chi_cuadrado_histograma(histograma)
+        estadisticas_lsb = self.analisis_lsb(plano, histograma)
         correlacion_h, correlacion_v = self.analisis_correlacion_espacial(canal)
         sospecha = self.calcular_puntuacion_sospecha(valor_p_chi, estadisticas_lsb, correlacion_h, correlacion_v)
 
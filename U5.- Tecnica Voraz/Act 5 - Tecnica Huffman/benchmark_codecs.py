@@ -0,0 +1,218 @@
+import os, csv, json, time, random, argparse, tempfile, tracemalloc, importlib.util
+import zlib, bz2, lzma
+
+# Benchmark sin GUI de los dos Huffman del repositorio (U5 y CodificadorHuffman del
+# proyecto final) contra zlib/bz2/lzma. Para cada archivo del corpus mide ratio,
+# MB/s de compresion y descompresion, y memoria pico con tracemalloc. Los tiempos se
+# toman en una pasada sin tracemalloc (que hace mas lento el codigo Python) y la
+# memoria en una segunda pasada.
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+RAIZ_REPO = os.path.abspath(os.path.join(DIR, "..", ".."))
+RUTA_PROYECTO_FINAL = os.path.join(RAIZ_REPO, "ProyectoFinal_Snoopy", "LSB_DETECTOR_HUFFMAN", "huffman.py")
+
+TEXTOS_CORPUS = [
+    "README.md",
+    "ProyectoFinal_Snoopy/LSB_DETECTOR_HUFFMAN/README_DETECTORLSB.md",
+    "U5.- Tecnica Voraz/Act 5 - Tecnica Huffman/equipo_Snoopy.txt",
+]
+
+CAMPOS = ["archivo", "tipo", "tam_original", "codec", "tam_comprimido", "ratio",
+          "compresion_mb_s", "descompresion_mb_s", "memoria_compresion_kb",
+          "memoria_descompresion_kb", "correcto"]
+
+def cargar_modulo(nombre, ruta):
+    # los dos modulos se llaman huffman.py y viven en carpetas con espacios
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+# --- corpus ---
+
+def generar_corpus(directorio, tam=1 << 18, semilla=0):
+    rnd = random.Random(semilla)
+    os.makedirs(directorio, exist_ok=True)
+
+    # texto: documentos fijos del repositorio, repetidos hasta el tamaño pedido; una
+    # lista fija hace que el corpus no dependa de archivos generados en la carpeta
+    partes = []
+    for relativa in TEXTOS_CORPUS:
+        ruta = os.path.join(RAIZ_REPO, *relativa.split("/"))
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8", errors="ignore") as f:
+                partes.append(f.read())
+    texto = "\n".join(partes) or "sin texto local"
+    datos = texto.encode("utf-8")
+    # el corte a tam bytes puede partir un caracter multibyte; se retrocede hasta
+    # el ultimo caracter completo para que el archivo siga siendo UTF-8 valido
+    recorte = (datos * (tam // len(datos) + 1))[:tam]
+    with open(os.path.join(directorio, "texto.txt"), "wb") as f:
+        f.write(recorte.decode("utf-8", errors="ignore").encode("utf-8"))
+
+    metodos = ["GET", "POST", "PUT", "DELETE"]
+    rutas = ["/api/v1/usuarios", "/api/v1/rutas", "/login", "/static/app.js", "/imagenes/estego.png"]
+    with open(os.path.join(directorio, "servidor.log"), "w", encoding="utf-8") as f:
+        escritos = 0
+        segundo = 0
+        while escritos < tam:
+            segundo += rnd.randint(0, 3)
+            linea = (f"2025-11-27 {segundo // 3600 % 24:02d}:{segundo // 60 % 60:02d}:{segundo % 60:02d} "
+                     f"INFO 10.0.{rnd.randint(0, 255)}.{rnd.randint(0, 255)} {rnd.choice(metodos)} "
+                     f"{rnd.choice(rutas)} {rnd.choice([200, 200, 200, 301, 404, 500])} {rnd.randint(80, 90000)}B "
+                     f"{rnd.random() * 500:.1f}ms\n")
+            f.write(linea)
+            escritos += len(linea)
+
+    registros = []
+    escritos = 0
+    while escritos < tam:
+        registro = {"id": len(registros), "parada": f"Parada {rnd.randint(1, 400)}",
+                    "lat": round(20.6 + rnd.random() / 10, 6), "lon": round(-103.4 + rnd.random() / 10, 6),
+                    "lineas": rnd.sample(range(1, 120), rnd.randint(1, 5)), "activa": rnd.random() > 0.1}
+        registros.append(registro)
+        escritos += len(json.dumps(registro)) + 2
+    with open(os.path.join(directorio, "datos.json"), "w", encoding="utf-8") as f:
+        json.dump(registros, f, indent=1)
+
+    with open(os.path.join(directorio, "aleatorio.bin"), "wb") as f:
+        f.write(rnd.randbytes(tam))
+
+def tipo_archivo(ruta):
+    extension = os.path.splitext(ruta)[1].lower()
+    return {".txt": "texto", ".md": "texto", ".log": "log", ".json": "json"}.get(extension, "binario")
+
+# --- codecs: comprimir(ruta_entrada, ruta_bin) y descomprimir(ruta_bin, ruta_salida) ---
+
+def _codec_memoria(comprimir, descomprimir):
+    def c(ruta_in, ruta_bin):
+        with open(ruta_in, "rb") as f:
+            datos = f.read()
+        with open(ruta_bin, "wb") as f:
+            f.write(comprimir(datos))
+    def d(ruta_bin, ruta_out):
+        with open(ruta_bin, "rb") as f:
+            datos = f.read()
+        with open(ruta_out, "wb") as f:
+            f.write(descomprimir(datos))
+    return c, d
+
+def _a_texto(datos):
+    # CodificadorHuffman trabaja con str: UTF-8 si es valido, si no latin-1 (sin perdidas)
+    try:
+        return datos.decode("utf-8"), "u"
+    except UnicodeDecodeError:
+        return datos.decode("latin-1"), "l"
+
+def _codec_proyecto_final(modulo, empaquetar):
+    def comprimir(datos):
+        texto, cod = _a_texto(datos)
+        payload, _, _ = empaquetar(modulo.CodificadorHuffman(), texto)
+        return cod.encode() + payload
+    def descomprimir(datos):
+        texto, _ = modulo.CodificadorHuffman().desempaquetar_payload(datos[1:])
+        return texto.encode("utf-8" if datos[:1] == b"u" else "latin-1")
+    return _codec_memoria(comprimir, descomprimir)
+
+def codecs_disponibles(u5, pf, adaptativo=True):
+    codecs = {
+        "u5_texto": (lambda i, o: u5.comprimir_contenedor(i, o, workers=1),
+                     lambda i, o: u5.descomprimir_contenedor(i, o, workers=1)),
+        "u5_bytes": (lambda i, o: u5.comprimir_contenedor(i, o, workers=1, modo_bytes=True),
+                     lambda i, o: u5.descomprimir_contenedor(i, o, workers=1)),
+    }
+    if adaptativo:
+        def c(i, o):
+            with open(i, "rb") as fin, open(o, "wb") as fout:
+                u5.comprimir_adaptativo(fin, fout)
+        def d(i, o):
+            with open(i, "rb") as fin, open(o, "wb") as fout:
+                u5.descomprimir_adaptativo(fin, fout)
+        codecs["u5_adaptativo"] = (c, d)
+    codecs["pf_orden0"] = _codec_proyecto_final(pf, lambda h, t: h.empaquetar_payload(t))
+    codecs["pf_orden1"] = _codec_proyecto_final(pf, lambda h, t: h.empaquetar_payload_orden1(t))
+    codecs["pf_palabras"] = _codec_proyecto_final(pf, lambda h, t: h.empaquetar_payload_palabras(t))
+    codecs["zlib"] = _codec_memoria(lambda d: zlib.compress(d, 6), zlib.decompress)
+    codecs["bz2"] = _codec_memoria(lambda d: bz2.compress(d, 9), bz2.decompress)
+    codecs["lzma"] = _codec_memoria(lambda d: lzma.compress(d, preset=6), lzma.decompress)
+    return codecs
+
+# --- medicion ---
+
+def _pico_memoria(funcion, *args):
+    tracemalloc.start()
+    try:
+        funcion(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def medir(ruta, nombre, comprimir, descomprimir, tmp):
+    ruta_bin = os.path.join(tmp, nombre + ".bin")
+    ruta_out = os.path.join(tmp, nombre + ".out")
+    tam = os.path.getsize(ruta)
+    mb = tam / (1 << 20)
+    t0 = time.perf_counter()
+    comprimir(ruta, ruta_bin)
+    t1 = time.perf_counter()
+    descomprimir(ruta_bin, ruta_out)
+    t2 = time.perf_counter()
+    with open(ruta, "rb") as a, open(ruta_out, "rb") as b:
+        correcto = a.read() == b.read()
+    comprimido = os.path.getsize(ruta_bin)
+    memoria_c = _pico_memoria(comprimir, ruta, ruta_bin)
+    memoria_d = _pico_memoria(descomprimir, ruta_bin, ruta_out)
+    return {
+        "archivo": os.path.basename(ruta), "tipo": tipo_archivo(ruta), "tam_original": tam,
+        "codec": nombre, "tam_comprimido": comprimido,
+        "ratio": round(comprimido / tam, 4) if tam else 0,
+        "compresion_mb_s": round(mb / (t1 - t0), 3), "descompresion_mb_s": round(mb / (t2 - t1), 3),
+        "memoria_compresion_kb": memoria_c // 1024, "memoria_descompresion_kb": memoria_d // 1024,
+        "correcto": correcto,
+    }
+
+def ejecutar(corpus, salida_csv, codecs_elegidos=None, adaptativo=True):
+    u5 = cargar_modulo("huffman_u5", os.path.join(DIR, "huffman.py"))
+    pf = cargar_modulo("huffman_proyecto_final", RUTA_PROYECTO_FINAL)
+    codecs = codecs_disponibles(u5, pf, adaptativo)
+    if codecs_elegidos:
+        codecs = {n: c for n, c in codecs.items() if n in codecs_elegidos}
+    archivos = sorted(os.path.join(corpus, n) for n in os.listdir(corpus)
+                      if os.path.isfile(os.path.join(corpus, n)))
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp, open(salida_csv, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.DictWriter(f, fieldnames=CAMPOS)
+        escritor.writeheader()
+        print(f"{'archivo':<16} {'codec':<14} {'ratio':>7} {'comp MB/s':>10} {'desc MB/s':>10} "
+              f"{'mem comp KB':>12} {'mem desc KB':>12}  ok")
+        for ruta in archivos:
+            for nombre, (comprimir, descomprimir) in codecs.items():
+                fila = medir(ruta, nombre, comprimir, descomprimir, tmp)
+                escritor.writerow(fila)
+                f.flush()
+                resultados.append(fila)
+                print(f"{fila['archivo']:<16} {nombre:<14} {fila['ratio']:>7.3f} {fila['compresion_mb_s']:>10.2f} "
+                      f"{fila['descompresion_mb_s']:>10.2f} {fila['memoria_compresion_kb']:>12} "
+                      f"{fila['memoria_descompresion_kb']:>12}  {fila['correcto']}")
+    return resultados
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los codecs Huffman contra zlib/bz2/lzma")
+    parser.add_argument("--corpus", help="Carpeta con los archivos a medir (por defecto se genera uno)")
+    parser.add_argument("--tam", type=int, default=1 << 18, help="Bytes por archivo del corpus generado")
+    parser.add_argument("--salida", default="benchmark_huffman.csv", help="Archivo CSV de resultados")
+    parser.add_argument("--codecs", nargs="*", help="Solo estos codecs (u5_texto, pf_orden0, zlib, ...)")
+    parser.add_argument("--sin-adaptativo", action="store_true", help="Omite el Huffman adaptativo (lento)")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        ejecutar(args.corpus, args.salida, args.codecs, not args.sin_adaptativo)
+    else:
+        with tempfile.TemporaryDirectory() as corpus:
+            generar_corpus(corpus, args.tam)
+            ejecutar(corpus, args.salida, args.codecs, not args.sin_adaptativo)
+    print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
-import heapq, json, os, math
+import heapq, json, os, math, sys, argparse, struct, mmap, bisect
+import numpy as np
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+# caracteres por bloque al leer archivos grandes
+TAM_BLOQUE = 1 << 20
 
 class HuffmanNode:
     def __init__(self, freq, char=None, left=None, right=None):
@@ -11,12 +18,9 @@ class HuffmanNode:
     def __lt__(self, other):
         return self.freq < other.freq
 
-def contar_frecuencias(texto):
-    freqs = {}
-    for c in texto:
-        freqs[c] = freqs.get(c, 0) + 1
-    return freqs
-
+# construir_arbol y generar_codigos son la version voraz de referencia (cola de
+# prioridad con los dos nodos de menor frecuencia). El compresor ya no las usa: toma
+# las longitudes de longitudes_huffman, igual de optimas y sin crear nodos
 def construir_arbol(freqs):
     heap = []
     for ch, f in freqs.items():
@@ -48,50 +52,582 @@ def generar_codigos(root):
     dfs(root, "")
     return codes
 
-def bits_a_bytes(bitstring):
-    b = bytearray()
-    for i in range(0, len(bitstring), 8):
-        byte = bitstring[i:i+8]
-        b.append(int(byte, 2))
-    return bytes(b)
+def longitudes_huffman(freqs):
+    # metodo de dos colas: con las hojas ordenadas por frecuencia, los nodos internos
+    # salen en orden no decreciente, asi que el minimo siempre esta al frente de la cola
+    # de hojas o de la de internos. O(n) despues de ordenar, con arreglos paralelos
+    # (peso, padre) en lugar de HuffmanNode + heapq, y sin recursion para las longitudes
+    simbolos = sorted(freqs, key=lambda c: (freqs[c], c))
+    n = len(simbolos)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {simbolos[0]: 1}
+    peso = [freqs[c] for c in simbolos] + [0] * (n - 1)
+    padre = [0] * (2 * n - 1)
+    hoja, interno = 0, n
+    for nuevo in range(n, 2 * n - 1):
+        if hoja < n and (interno == nuevo or peso[hoja] <= peso[interno]):
+            a, hoja = hoja, hoja + 1
+        else:
+            a, interno = interno, interno + 1
+        if hoja < n and (interno == nuevo or peso[hoja] <= peso[interno]):
+            b, hoja = hoja, hoja + 1
+        else:
+            b, interno = interno, interno + 1
+        peso[nuevo] = peso[a] + peso[b]
+        padre[a] = padre[b] = nuevo
+    # cada padre tiene indice mayor que sus hijos y la raiz es el ultimo nodo
+    profundidad = [0] * (2 * n - 1)
+    for i in range(2 * n - 3, -1, -1):
+        profundidad[i] = profundidad[padre[i]] + 1
+    return {c: profundidad[i] for i, c in enumerate(simbolos)}
+
+def codigos_canonicos(longitudes):
+    # mismos largos que el arbol; los codigos se asignan en orden (largo, simbolo)
+    codes = {}
+    code = 0
+    largo_prev = 0
+    for ch, largo in sorted(longitudes.items(), key=lambda x: (x[1], x[0])):
+        code <<= largo - largo_prev
+        codes[ch] = format(code, f"0{largo}b")
+        code += 1
+        largo_prev = largo
+    return codes
+
+def leer_bloques(ruta_txt, tam_bloque=TAM_BLOQUE):
+    with open(ruta_txt, "r", encoding="utf-8", errors="ignore", newline="") as f:
+        while True:
+            bloque = f.read(tam_bloque)
+            if not bloque:
+                return
+            yield bloque
+
+def contar_frecuencias_archivo(ruta_txt, tam_bloque=TAM_BLOQUE):
+    freqs = Counter()
+    for bloque in leer_bloques(ruta_txt, tam_bloque):
+        freqs.update(bloque)
+    return dict(freqs)
 
-def bytes_a_bits(b):
-    return "".join(f"{byte:08b}" for byte in b)
+class EscritorBits:
+    # acumula bits y solo escribe bytes completos; quedan pendientes menos de 8 bits
+    def __init__(self, f):
+        self.f = f
+        self.pendiente = ""
+        self.bytes_escritos = 0
 
-def guardar_comprimido(ruta_bin, bitstring):
-    pad_len = (8 - len(bitstring) % 8) % 8
-    bitstring_padded = bitstring + ("0" * pad_len)
-    data = bits_a_bytes(bitstring_padded)
+    def escribir(self, bitstring):
+        bits = self.pendiente + bitstring
+        completos = len(bits) - len(bits) % 8
+        if completos:
+            self.f.write(int(bits[:completos], 2).to_bytes(completos // 8, "big"))
+            self.bytes_escritos += completos // 8
+        self.pendiente = bits[completos:]
+
+    def cerrar(self):
+        pad_len = (8 - len(self.pendiente) % 8) % 8
+        if self.pendiente:
+            self.escribir("0" * pad_len)
+        return pad_len
+
+def tabla_decodificacion(codes):
+    # estados = prefijos pendientes (nodos internos del arbol); para cada estado y cada
+    # byte se guardan los caracteres completos que produce y el estado siguiente.
+    # El ultimo estado marca un codigo invalido
+    estados = {"": 0}
+    for code in codes.values():
+        for i in range(1, len(code)):
+            estados.setdefault(code[:i], len(estados))
+    invalido = len(estados)
+    inv = {v: k for k, v in codes.items()}
+    tabla_bits = []
+    for pref in estados:
+        fila = []
+        for bit in "01":
+            cur = pref + bit
+            if cur in inv:
+                fila.append((inv[cur], 0))
+            else:
+                fila.append(("", estados.get(cur, invalido)))
+        tabla_bits.append(fila)
+    tabla_bits.append([("", invalido)] * 2)
+    # componer tablas de 1 -> 2 -> 4 -> 8 bits
+    tabla = tabla_bits
+    for _ in range(3):
+        tabla = [[(c1 + c2, e2) for c1, e1 in fila for c2, e2 in tabla[e1]] for fila in tabla]
+    return tabla_bits, tabla, invalido
+
+def decodificar_bloque(data, tabla, estado=0):
+    salida = []
+    for byte in data:
+        chars, estado = tabla[estado][byte]
+        salida.append(chars)
+    return "".join(salida), estado
+
+def comprimir_archivo(ruta_txt, ruta_bin, ruta_json=None, tam_bloque=TAM_BLOQUE):
+    # pasada 1: frecuencias por bloques; pasada 2: codificar y escribir bytes empaquetados
+    freqs = contar_frecuencias_archivo(ruta_txt, tam_bloque)
+    codes = codigos_canonicos(longitudes_huffman(freqs))
     with open(ruta_bin, "wb") as f:
-        f.write(bytes([pad_len]))   
-        f.write(data)
+        f.write(b"\x00")   # pad_len, se corrige al final
+        escritor = EscritorBits(f)
+        for bloque in leer_bloques(ruta_txt, tam_bloque):
+            escritor.escribir("".join(map(codes.__getitem__, bloque)))
+        pad_len = escritor.cerrar()
+        f.seek(0)
+        f.write(bytes([pad_len]))
+    if ruta_json:
+        with open(ruta_json, "w", encoding="utf-8") as f:
+            json.dump(codes, f, ensure_ascii=False)
+    return codes
+
+def descomprimir_archivo(ruta_bin, codes, ruta_txt, tam_bloque=TAM_BLOQUE):
+    tabla_bits, tabla, invalido = tabla_decodificacion(codes)
+    total = os.path.getsize(ruta_bin) - 1
+    estado = 0
+    with open(ruta_bin, "rb") as fin, open(ruta_txt, "w", encoding="utf-8", newline="") as fout:
+        pad_byte = fin.read(1)
+        pad_len = pad_byte[0] if pad_byte else 0
+        leidos = 0
+        while leidos < total:
+            data = fin.read(min(tam_bloque, total - leidos))
+            if not data:
+                break
+            leidos += len(data)
+            ultimo = leidos >= total and pad_len
+            texto, estado = decodificar_bloque(data[:-1] if ultimo else data, tabla, estado)
+            fout.write(texto)
+            if ultimo:
+                # bits validos del ultimo byte
+                for i in range(8 - pad_len):
+                    chars, estado = tabla_bits[estado][(data[-1] >> (7 - i)) & 1]
+                    fout.write(chars)
+    if estado == invalido:
+        raise ValueError("Código Huffman inválido")
+
+def decodificar_bits_bloque(data, n_bits, tablas, estado=0):
+    # decodifica exactamente n_bits de data; el ultimo byte puede estar incompleto
+    tabla_bits, tabla, invalido = tablas
+    completos = n_bits // 8
+    texto, estado = decodificar_bloque(data[:completos], tabla, estado)
+    partes = [texto]
+    for i in range(n_bits % 8):
+        chars, estado = tabla_bits[estado][(data[completos] >> (7 - i)) & 1]
+        partes.append(chars)
+    if estado == invalido:
+        raise ValueError("Código Huffman inválido")
+    return "".join(partes), estado
+
+# --- contenedor por bloques ---
+# cada bloque de texto se codifica por separado y empieza en un byte nuevo; el
+# indice de bloques permite decodificarlos en paralelo o saltar directo a uno.
+#
+#   "HUF" | version (1 byte) | modo (1 byte) | <I largo de la tabla | tabla
+#   datos de los bloques
+#   indice: n_bloques x <QQQ (offset, n_bits, offset en el original en bytes)
+#   <QQQ (offset del indice, n_bloques, tamaño original en bytes)
+#
+# modo texto: la tabla es el JSON de codigos por caracter (utf-8).
+# modo bytes: la tabla son 256 longitudes de codigo (una por byte, 0 = no aparece)
+# y los codigos son canonicos. Internamente cada byte se trata como el caracter
+# latin-1 del mismo valor, asi que el resto del codec no cambia.
+# La version 1 no tiene byte de modo y siempre es texto.
 
-def leer_comprimido(ruta_bin):
+MAGIA = b"HUF"
+VERSION_CONTENEDOR = 2
+MODO_TEXTO = 0
+MODO_BYTES = 1
+ENTRADA_INDICE = struct.Struct("<QQQ")
+PIE = struct.Struct("<QQQ")
+
+def leer_bloques_bytes(ruta, tam_bloque=TAM_BLOQUE):
+    with open(ruta, "rb") as f:
+        while True:
+            bloque = f.read(tam_bloque)
+            if not bloque:
+                return
+            yield bloque
+
+_codes_proceso = None
+_tablas_proceso = None
+
+def _iniciar_proceso(codes):
+    global _codes_proceso, _tablas_proceso
+    _codes_proceso = codes
+    _tablas_proceso = tabla_decodificacion(codes) if codes else None
+
+def _contar_bloque(bloque):
+    return Counter(bloque)
+
+def _contar_bytes(bloque):
+    return np.bincount(np.frombuffer(bloque, dtype=np.uint8), minlength=256)
+
+def _codificar_bloque(bloque):
+    bits = "".join(map(_codes_proceso.__getitem__, bloque))
+    pad_len = (8 - len(bits) % 8) % 8
+    data = int(bits + "0" * pad_len, 2).to_bytes((len(bits) + pad_len) // 8, "big") if bits else b""
+    return data, len(bits), len(bloque.encode("utf-8"))
+
+def _codificar_bytes(bloque):
+    data, n_bits, _ = _codificar_bloque(bloque.decode("latin-1"))
+    return data, n_bits, len(bloque)
+
+def _decodificar_bloque_archivo(args):
+    ruta_bin, offset, n_bits = args
     with open(ruta_bin, "rb") as f:
-        pad_len_byte = f.read(1)
-        if not pad_len_byte:
-            return ""
-        pad_len = pad_len_byte[0]
-        data = f.read()
-    bitstring = bytes_a_bits(data)
-    if pad_len:
-        bitstring = bitstring[:-pad_len]
-    return bitstring
-
-def codificar_texto(texto, codes):
-    return "".join(codes[ch] for ch in texto)
-
-def decodificar_bits(bitstring, codes):
-   
-    inv = {v: k for k, v in codes.items()}
-    decoded_chars = []
-    cur = ""
-    for bit in bitstring:
-        cur += bit
-        if cur in inv:
-            decoded_chars.append(inv[cur])
-            cur = ""
-    return "".join(decoded_chars)
+        f.seek(offset)
+        data = f.read((n_bits + 7) // 8)
+    return decodificar_bits_bloque(data, n_bits, _tablas_proceso)[0]
+
+def _ejecutor(workers, codes=None):
+    # con un solo worker todo corre en este proceso, sin pool (executor = None)
+    if workers == 1:
+        if codes is not None:
+            _iniciar_proceso(codes)
+        return nullcontext()
+    if codes is None:
+        return ProcessPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_proceso, initargs=(codes,))
+
+def _mapear_en_orden(executor, funcion, elementos, ventana):
+    # como executor.map, pero con a lo mas `ventana` tareas pendientes (memoria acotada)
+    if executor is None:
+        yield from map(funcion, elementos)
+        return
+    pendientes = deque()
+    for elem in elementos:
+        pendientes.append(executor.submit(funcion, elem))
+        if len(pendientes) >= ventana:
+            yield pendientes.popleft().result()
+    while pendientes:
+        yield pendientes.popleft().result()
+
+def es_contenedor(ruta_bin):
+    with open(ruta_bin, "rb") as f:
+        return f.read(len(MAGIA)) == MAGIA
+
+def comprimir_contenedor(ruta_txt, ruta_bin, workers=None, tam_bloque=TAM_BLOQUE, modo_bytes=False):
+    workers = workers or os.cpu_count() or 1
+    ventana = 2 * workers
+    if modo_bytes:
+        # alfabeto fijo de 256 simbolos: conteo con bincount y tabla de 256 longitudes
+        leer, codificar = leer_bloques_bytes, _codificar_bytes
+        conteo = np.zeros(256, dtype=np.int64)
+        with _ejecutor(workers) as ex:
+            for parcial in _mapear_en_orden(ex, _contar_bytes, leer(ruta_txt, tam_bloque), ventana):
+                conteo += parcial
+        freqs = {chr(b): int(conteo[b]) for b in np.flatnonzero(conteo)}
+        codes = codigos_canonicos(longitudes_huffman(freqs))
+        tabla = bytes(len(codes.get(chr(b), "")) for b in range(256))
+    else:
+        leer, codificar = leer_bloques, _codificar_bloque
+        freqs = Counter()
+        with _ejecutor(workers) as ex:
+            for parcial in _mapear_en_orden(ex, _contar_bloque, leer(ruta_txt, tam_bloque), ventana):
+                freqs.update(parcial)
+        codes = codigos_canonicos(longitudes_huffman(freqs))
+        tabla = json.dumps(codes, ensure_ascii=False).encode("utf-8")
+
+    bloques = []
+    original = 0
+    with _ejecutor(workers, codes) as ex, \
+         open(ruta_bin, "wb") as f:
+        modo = MODO_BYTES if modo_bytes else MODO_TEXTO
+        f.write(MAGIA + bytes([VERSION_CONTENEDOR, modo]) + struct.pack("<I", len(tabla)) + tabla)
+        offset = f.tell()
+        for data, n_bits, n_original in _mapear_en_orden(ex, codificar, leer(ruta_txt, tam_bloque), ventana):
+            f.write(data)
+            bloques.append((offset, n_bits, original))
+            offset += len(data)
+            original += n_original
+        for bloque in bloques:
+            f.write(ENTRADA_INDICE.pack(*bloque))
+        f.write(PIE.pack(offset, len(bloques), original))
+    return codes, bloques
+
+def leer_cabecera_contenedor(mm):
+    # devuelve (codes, bloques, tamaño original, modo_bytes) leyendo solo la cabecera y el indice
+    if mm[:len(MAGIA)] != MAGIA:
+        raise ValueError("No es un contenedor Huffman")
+    version = mm[len(MAGIA)]
+    if version == 1:
+        modo, inicio = MODO_TEXTO, len(MAGIA) + 1
+    elif version == VERSION_CONTENEDOR:
+        modo, inicio = mm[len(MAGIA) + 1], len(MAGIA) + 2
+    else:
+        raise ValueError(f"Versión de contenedor no soportada: {version}")
+    (largo_tabla,) = struct.unpack_from("<I", mm, inicio)
+    tabla = bytes(mm[inicio + 4:inicio + 4 + largo_tabla])
+    if modo == MODO_BYTES:
+        codes = codigos_canonicos({chr(b): largo for b, largo in enumerate(tabla) if largo})
+    else:
+        codes = json.loads(tabla.decode("utf-8"))
+    offset_indice, n_bloques, original = PIE.unpack_from(mm, len(mm) - PIE.size)
+    bloques = [ENTRADA_INDICE.unpack_from(mm, offset_indice + i * ENTRADA_INDICE.size)
+               for i in range(n_bloques)]
+    return codes, bloques, original, modo == MODO_BYTES
+
+def abrir_contenedor(ruta_bin):
+    with open(ruta_bin, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return leer_cabecera_contenedor(mm)
+
+def descomprimir_contenedor(ruta_bin, ruta_txt, workers=None):
+    workers = workers or os.cpu_count() or 1
+    codes, bloques, _, modo_bytes = abrir_contenedor(ruta_bin)
+    tareas = ((ruta_bin, offset, n_bits) for offset, n_bits, _ in bloques)
+    with _ejecutor(workers, codes) as ex, \
+         open(ruta_txt, "wb") as fout:
+        for texto in _mapear_en_orden(ex, _decodificar_bloque_archivo, tareas, 2 * workers):
+            fout.write(texto.encode("latin-1" if modo_bytes else "utf-8"))
+    return codes
+
+class ContenedorHuffman:
+    # contenedor abierto para muchas lecturas de rango: la cabecera, el indice y la
+    # tabla de decodificacion se leen una sola vez, y se guarda el ultimo bloque
+    # decodificado para lecturas seguidas dentro del mismo bloque.
+    # Cada lectura decodifica completos los bloques que cubren el rango, asi que su
+    # latencia crece con tam_bloque: con el valor por defecto (1M caracteres) leer
+    # 100 bytes cuesta decodificar ~1 MB. Bloques mas chicos (--bloque al comprimir)
+    # bajan esa latencia a cambio de un indice mas grande y un poco menos de
+    # compresion, porque cada bloque empieza en un byte nuevo.
+    def __init__(self, ruta_bin):
+        self.f = open(ruta_bin, "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.codes, self.bloques, self.original, self.modo_bytes = leer_cabecera_contenedor(self.mm)
+        self.inicios = [b[2] for b in self.bloques]
+        self.tablas = None
+        self.ultimo = (None, b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def cerrar(self):
+        self.mm.close()
+        self.f.close()
+
+    def bloque(self, i):
+        # bytes originales del bloque i
+        if self.ultimo[0] == i:
+            return self.ultimo[1]
+        if self.tablas is None:
+            self.tablas = tabla_decodificacion(self.codes)
+        pos, n_bits, _ = self.bloques[i]
+        texto, _ = decodificar_bits_bloque(self.mm[pos:pos + (n_bits + 7) // 8], n_bits, self.tablas)
+        datos = texto.encode("latin-1" if self.modo_bytes else "utf-8")
+        self.ultimo = (i, datos)
+        return datos
+
+    def leer_rango(self, offset, length):
+        # bytes [offset, offset+length) del texto original; solo se decodifican los
+        # bloques que cubren el rango
+        fin = min(offset + length, self.original)
+        if offset >= fin:
+            return b""
+        primero = bisect.bisect_right(self.inicios, offset) - 1
+        partes = []
+        i = primero
+        while i < len(self.bloques) and self.inicios[i] < fin:
+            partes.append(self.bloque(i))
+            i += 1
+        base = self.inicios[primero]
+        return b"".join(partes)[offset - base:fin - base]
+
+def leer_rango(ruta_bin, offset, length):
+    # lectura suelta; para varias lecturas del mismo archivo usar ContenedorHuffman
+    with ContenedorHuffman(ruta_bin) as contenedor:
+        return contenedor.leer_rango(offset, length)
+
+# --- Huffman adaptativo (FGK) ---
+# una sola pasada: codificador y decodificador actualizan el mismo arbol despues de
+# cada simbolo, asi que no se cuentan frecuencias ni se guarda la tabla. Alfabeto de
+# bytes (0-255) mas FIN (256); un simbolo nuevo se envia como el codigo del nodo NYT
+# seguido de sus 9 bits. El arbol tiene a lo mas 2*257-1 nodos: memoria constante.
+
+MAGIA_ADAPTATIVO = b"HUFA"
+FIN_ADAPTATIVO = 256
+
+class ArbolAdaptativo:
+    def __init__(self):
+        # numero de orden de cada nodo (propiedad de hermanos): la raiz tiene el mayor
+        # y los pesos no decrecen al subir de numero
+        self.max_nodos = 2 * (FIN_ADAPTATIVO + 1)
+        self.peso = []
+        self.padre = []
+        self.izq = []
+        self.der = []
+        self.simbolo = []
+        self.numero = []
+        self.nodo_en = [-1] * self.max_nodos
+        self.hoja = {}
+        # codigos ya calculados; solo cambian al intercambiar nodos o dividir el NYT
+        self.cache = {}
+        self.raiz = self.nyt = self._nuevo(-1, self.max_nodos - 1)
+
+    def _nuevo(self, padre, numero, simbolo=-1):
+        i = len(self.peso)
+        self.peso.append(0)
+        self.padre.append(padre)
+        self.izq.append(-1)
+        self.der.append(-1)
+        self.simbolo.append(simbolo)
+        self.numero.append(numero)
+        self.nodo_en[numero] = i
+        return i
+
+    def _codigo(self, nodo):
+        bits = []
+        while nodo != self.raiz:
+            p = self.padre[nodo]
+            bits.append("1" if self.der[p] == nodo else "0")
+            nodo = p
+        return "".join(reversed(bits))
+
+    def _intercambiar(self, a, b):
+        self.cache.clear()
+        pa, pb = self.padre[a], self.padre[b]
+        if pa == pb:
+            self.izq[pa], self.der[pa] = self.der[pa], self.izq[pa]
+        else:
+            if self.izq[pa] == a:
+                self.izq[pa] = b
+            else:
+                self.der[pa] = b
+            if self.izq[pb] == b:
+                self.izq[pb] = a
+            else:
+                self.der[pb] = a
+            self.padre[a], self.padre[b] = pb, pa
+        na, nb = self.numero[a], self.numero[b]
+        self.numero[a], self.numero[b] = nb, na
+        self.nodo_en[na], self.nodo_en[nb] = b, a
+
+    def actualizar(self, simbolo):
+        nodo = self.hoja.get(simbolo)
+        if nodo is None:
+            # el NYT se divide en un NYT nuevo y la hoja del simbolo
+            viejo = self.nyt
+            num = self.numero[viejo]
+            self.nyt = self._nuevo(viejo, num - 2)
+            nodo = self._nuevo(viejo, num - 1, simbolo)
+            self.izq[viejo], self.der[viejo] = self.nyt, nodo
+            self.hoja[simbolo] = nodo
+            self.cache.clear()
+        peso, nodo_en, numero = self.peso, self.nodo_en, self.numero
+        while True:
+            # lider del bloque: el nodo de mayor numero con el mismo peso
+            w = peso[nodo]
+            lider_num = numero[nodo]
+            while lider_num + 1 < self.max_nodos and peso[nodo_en[lider_num + 1]] == w:
+                lider_num += 1
+            lider = nodo_en[lider_num]
+            if lider != nodo and lider != self.padre[nodo]:
+                self._intercambiar(nodo, lider)
+            peso[nodo] += 1
+            if nodo == self.raiz:
+                return
+            nodo = self.padre[nodo]
+
+    def codificar(self, simbolo):
+        nodo = self.hoja.get(simbolo)
+        if nodo is None:
+            code = self._codigo(self.nyt) + format(simbolo, "09b")
+        else:
+            code = self.cache.get(nodo)
+            if code is None:
+                code = self.cache[nodo] = self._codigo(nodo)
+        if simbolo != FIN_ADAPTATIVO:
+            self.actualizar(simbolo)
+        return code
+
+    def decodificar(self, leer_bit):
+        nodo = self.raiz
+        while self.izq[nodo] != -1:
+            nodo = self.der[nodo] if leer_bit() else self.izq[nodo]
+        if nodo == self.nyt:
+            simbolo = 0
+            for _ in range(9):
+                simbolo = simbolo * 2 + leer_bit()
+        else:
+            simbolo = self.simbolo[nodo]
+        if simbolo != FIN_ADAPTATIVO:
+            self.actualizar(simbolo)
+        return simbolo
+
+def _bits_de_flujo(f, tam=1 << 16):
+    while True:
+        data = f.read(tam)
+        if not data:
+            return
+        for byte in data:
+            for i in range(7, -1, -1):
+                yield (byte >> i) & 1
+
+def comprimir_adaptativo(fin, fout, tam=1 << 16):
+    # fin y fout son flujos binarios (archivos, sys.stdin.buffer, sockets.makefile("rb"))
+    fout.write(MAGIA_ADAPTATIVO)
+    arbol = ArbolAdaptativo()
+    escritor = EscritorBits(fout)
+    while True:
+        data = fin.read(tam)
+        if not data:
+            break
+        escritor.escribir("".join(map(arbol.codificar, data)))
+    escritor.escribir(arbol.codificar(FIN_ADAPTATIVO))
+    escritor.cerrar()
+
+def descomprimir_adaptativo(fin, fout, tam=1 << 16):
+    if fin.read(len(MAGIA_ADAPTATIVO)) != MAGIA_ADAPTATIVO:
+        raise ValueError("No es un flujo Huffman adaptativo")
+    arbol = ArbolAdaptativo()
+    leer_bit = _bits_de_flujo(fin).__next__
+    salida = bytearray()
+    try:
+        while True:
+            simbolo = arbol.decodificar(leer_bit)
+            if simbolo == FIN_ADAPTATIVO:
+                break
+            salida.append(simbolo)
+            if len(salida) >= tam:
+                fout.write(salida)
+                salida.clear()
+    except StopIteration:
+        raise ValueError("Flujo adaptativo truncado")
+    fout.write(salida)
+
+def benchmark(ruta_txt):
+    # codec estatico de dos pasadas contra el adaptativo de una pasada
+    import tempfile, time
+    orig_size = os.path.getsize(ruta_txt)
+    mb = orig_size / (1 << 20)
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path = os.path.join(tmp, "estatico.bin")
+        json_path = os.path.join(tmp, "estatico.json")
+        ada_path = os.path.join(tmp, "adaptativo.bin")
+        out_path = os.path.join(tmp, "salida.txt")
+
+        t0 = time.time()
+        codes = comprimir_archivo(ruta_txt, bin_path, json_path)
+        t1 = time.time()
+        descomprimir_archivo(bin_path, codes, out_path)
+        t2 = time.time()
+        est_size = os.path.getsize(bin_path) + os.path.getsize(json_path)
+        print(f"Estático (2 pasadas):    ratio {est_size / orig_size:.3f}  |  "
+              f"comprimir {mb / (t1 - t0):.2f} MB/s  |  descomprimir {mb / (t2 - t1):.2f} MB/s")
+
+        with open(ruta_txt, "rb") as fin, open(ada_path, "wb") as fout:
+            t0 = time.time()
+            comprimir_adaptativo(fin, fout)
+            t1 = time.time()
+        with open(ada_path, "rb") as fin, open(out_path, "wb") as fout:
+            descomprimir_adaptativo(fin, fout)
+            t2 = time.time()
+        with open(out_path, "rb") as a, open(ruta_txt, "rb") as b:
+            correcto = a.read() == b.read()
+        print(f"Adaptativo (1 pasada):   ratio {os.path.getsize(ada_path) / orig_size:.3f}  |  "
+              f"comprimir {mb / (t1 - t0):.2f} MB/s  |  descomprimir {mb / (t2 - t1):.2f} MB/s  |  correcto={correcto}")
 
 #GUI 
 class HuffmanGUI:
@@ -123,6 +659,11 @@ class HuffmanGUI:
         btn_show_codes = tk.Button(frame_top, text="Ver códigos", command=self.show_codes)
         btn_show_codes.grid(row=0, column=4, padx=6)
 
+        # modo bytes: alfabeto de 256 simbolos, sin perdidas para cualquier archivo
+        self.modo_bytes = tk.BooleanVar(value=False)
+        chk_bytes = tk.Checkbutton(frame_top, text="Modo bytes", variable=self.modo_bytes)
+        chk_bytes.grid(row=0, column=5, padx=6)
+
         stats_frame = tk.Frame(master)
         stats_frame.pack(pady=6)
         self.lbl_stats = tk.Label(stats_frame, text="No hay archivo cargado")
@@ -134,45 +675,40 @@ class HuffmanGUI:
         self.txt_area.pack(fill=tk.BOTH, expand=True)
 
     def open_file(self):
-        fp = filedialog.askopenfilename(filetypes=[("Text files","*.txt")])
+        fp = filedialog.askopenfilename(filetypes=[("Text files","*.txt"), ("Todos","*.*")])
         if not fp:
             return
         self.filepath = fp
+        # solo se carga la vista previa; la compresion lee el archivo por bloques
         with open(fp, "r", encoding="utf-8", errors="ignore") as f:
-            self.texto = f.read()
+            self.texto = f.read(10000)
         self.txt_area.delete(1.0, tk.END)
         self.txt_area.insert(tk.END, self.texto[:10000]) 
         self.lbl_stats.config(text=f"Archivo: {os.path.basename(fp)}  |  Tamaño: {os.path.getsize(fp)} bytes")
         messagebox.showinfo("Archivo cargado", "Archivo cargado correctamente. Ahora puedes comprimirlo.")
 
     def compress_file(self):
-        if not self.texto:
+        # se revisa la ruta y no la vista previa: un archivo vacio o binario (modo
+        # bytes) no tiene texto UTF-8 que mostrar pero se puede comprimir
+        if not self.filepath:
             messagebox.showwarning("Error", "Primero abre un archivo .txt")
             return
-        freqs = contar_frecuencias(self.texto)
-        root = construir_arbol(freqs)
-        self.codes = generar_codigos(root)
-        bitstring = codificar_texto(self.texto, self.codes)
-        
         folder = filedialog.askdirectory(title="Carpeta para guardar resultados")
         if not folder:
             return
         base = os.path.splitext(os.path.basename(self.filepath))[0]
         bin_path = os.path.join(folder, base + "_compressed.bin")
-        json_path = os.path.join(folder, base + "_codes.json")
-        guardar_comprimido(bin_path, bitstring)
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(self.codes, f, ensure_ascii=False)
+        self.codes, _ = comprimir_contenedor(self.filepath, bin_path, modo_bytes=self.modo_bytes.get())
         self.bin_path = bin_path
         orig_size = os.path.getsize(self.filepath)
-        comp_size = os.path.getsize(bin_path) + os.path.getsize(json_path)
+        comp_size = os.path.getsize(bin_path)
         saved = orig_size - comp_size
         pct = (1 - comp_size / orig_size) * 100 if orig_size>0 else 0
         self.lbl_stats.config(text=(
-            f"Original: {orig_size} bytes  |  Comprimido+codes: {comp_size} bytes  |  "
+            f"Original: {orig_size} bytes  |  Comprimido (con códigos): {comp_size} bytes  |  "
             f"Ahorro: {saved} bytes ({pct:.2f}%)"
         ))
-        messagebox.showinfo("Comprimido", f"Guardado: {bin_path}\nCódigos: {json_path}")
+        messagebox.showinfo("Comprimido", f"Guardado: {bin_path}")
 
     def decompress_file(self):
         if not self.bin_path:
@@ -182,25 +718,31 @@ class HuffmanGUI:
             self.bin_path = bin_fp
         else:
             bin_fp = self.bin_path
-        codes_fp = filedialog.askopenfilename(title="Selecciona códigos (.json)", filetypes=[("JSON files","*.json")])
-        if not codes_fp:
-            return
-        with open(codes_fp, "r", encoding="utf-8") as f:
-            codes = json.load(f)
-        bitstring = leer_comprimido(bin_fp)
-        texto = decodificar_bits(bitstring, codes)
+        codes = None
+        if not es_contenedor(bin_fp):
+            # formato anterior: los codigos van en un .json aparte
+            codes_fp = filedialog.askopenfilename(title="Selecciona códigos (.json)", filetypes=[("JSON files","*.json")])
+            if not codes_fp:
+                return
+            with open(codes_fp, "r", encoding="utf-8") as f:
+                codes = json.load(f)
         
         folder = filedialog.askdirectory(title="Carpeta para guardar texto descomprimido")
         if not folder:
             return
         base = os.path.splitext(os.path.basename(bin_fp))[0]
         out_path = os.path.join(folder, base + "_decompressed.txt")
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write(texto)
+        if codes is None:
+            self.codes = descomprimir_contenedor(bin_fp, out_path)
+        else:
+            descomprimir_archivo(bin_fp, codes, out_path)
+        # en modo bytes la salida puede ser binaria: la vista previa reemplaza lo que no es UTF-8
+        with open(out_path, "rb") as f:
+            texto = f.read(10000).decode("utf-8", errors="replace")
         messagebox.showinfo("Descomprimido", f"Descomprimido guardado en:\n{out_path}")
         self.txt_area.delete(1.0, tk.END)
-        self.txt_area.insert(tk.END, texto[:10000])
-        self.lbl_stats.config(text=f"Descomprimido: {out_path}  |  Tamaño: {len(texto.encode('utf-8'))} bytes")
+        self.txt_area.insert(tk.END, texto)
+        self.lbl_stats.config(text=f"Descomprimido: {out_path}  |  Tamaño: {os.path.getsize(out_path)} bytes")
 
     def save_codes(self):
         if not self.codes:
@@ -228,7 +770,78 @@ class HuffmanGUI:
         st.config(state=tk.DISABLED)
 
 
+def main_cli(argv):
+    parser = argparse.ArgumentParser(description="Compresor Huffman por bloques (sin GUI)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_comp = sub.add_parser("comprimir", help="Comprime un archivo de texto")
+    p_comp.add_argument("entrada")
+    p_comp.add_argument("salida", help="Archivo .bin de salida")
+    p_comp.add_argument("--codigos", help="Escribe el formato anterior (.bin + códigos en este .json)")
+    p_comp.add_argument("--workers", type=int, default=None, help="Procesos para codificar bloques")
+    p_comp.add_argument("--bloque", type=int, default=TAM_BLOQUE,
+                        help="Caracteres por bloque; bloques chicos hacen más rápido 'rango'")
+    p_comp.add_argument("--bytes", action="store_true",
+                        help="Alfabeto de 256 bytes: sin pérdidas para archivos binarios o con UTF-8 inválido")
+    p_desc = sub.add_parser("descomprimir", help="Descomprime un archivo .bin")
+    p_desc.add_argument("entrada")
+    p_desc.add_argument("salida")
+    p_desc.add_argument("--codigos", help="Archivo .json de códigos (solo formato anterior)")
+    p_desc.add_argument("--workers", type=int, default=None, help="Procesos para decodificar bloques")
+    p_rango = sub.add_parser("rango", help="Extrae un rango de bytes del texto original")
+    p_rango.add_argument("entrada")
+    p_rango.add_argument("offset", type=int)
+    p_rango.add_argument("longitud", type=int)
+    p_ada = sub.add_parser("adaptativo", help="Huffman adaptativo de una pasada (stdin -> stdout por defecto)")
+    p_ada.add_argument("modo", choices=["comprimir", "descomprimir"])
+    p_ada.add_argument("entrada", nargs="?", default="-")
+    p_ada.add_argument("salida", nargs="?", default="-")
+    p_bench = sub.add_parser("benchmark", help="Compara el codec estático con el adaptativo")
+    p_bench.add_argument("entrada")
+    args = parser.parse_args(argv)
+
+    if args.comando == "comprimir":
+        if args.codigos:
+            comprimir_archivo(args.entrada, args.salida, args.codigos)
+            comp_size = os.path.getsize(args.salida) + os.path.getsize(args.codigos)
+        else:
+            comprimir_contenedor(args.entrada, args.salida, args.workers, args.bloque, modo_bytes=args.bytes)
+            comp_size = os.path.getsize(args.salida)
+        orig_size = os.path.getsize(args.entrada)
+        pct = (1 - comp_size / orig_size) * 100 if orig_size>0 else 0
+        print(f"Original: {orig_size} bytes  |  Comprimido: {comp_size} bytes  |  Ahorro: {pct:.2f}%")
+    elif args.comando == "descomprimir":
+        if es_contenedor(args.entrada):
+            descomprimir_contenedor(args.entrada, args.salida, args.workers)
+        elif args.codigos:
+            with open(args.codigos, "r", encoding="utf-8") as f:
+                codes = json.load(f)
+            descomprimir_archivo(args.entrada, codes, args.salida)
+        else:
+            parser.error("el archivo usa el formato anterior; indica --codigos")
+        print(f"Descomprimido: {args.salida}  |  Tamaño: {os.path.getsize(args.salida)} bytes")
+    elif args.comando == "rango":
+        sys.stdout.buffer.write(leer_rango(args.entrada, args.offset, args.longitud))
+    elif args.comando == "adaptativo":
+        fin = sys.stdin.buffer if args.entrada == "-" else open(args.entrada, "rb")
+        fout = sys.stdout.buffer if args.salida == "-" else open(args.salida, "wb")
+        try:
+            if args.modo == "comprimir":
+                comprimir_adaptativo(fin, fout)
+            else:
+                descomprimir_adaptativo(fin, fout)
+        finally:
+            fout.flush()
+            if fin is not sys.stdin.buffer:
+                fin.close()
+            if fout is not sys.stdout.buffer:
+                fout.close()
+    else:
+        benchmark(args.entrada)
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = HuffmanGUI(root)
-    root.mainloop()
+    if len(sys.argv) > 1:
+        main_cli(sys.argv[1:])
+    else:
+        root = tk.Tk()
+        app = HuffmanGUI(root)
+        root.mainloop()
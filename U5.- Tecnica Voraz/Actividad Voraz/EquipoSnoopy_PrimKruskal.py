@@ -1,14 +1,24 @@
+import os
+import sys
+import csv
+import math
 import heapq
+import tempfile
+from array import array
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 class GrafoAutobuses:    
     def __init__(self):
         self.grafo = defaultdict(list)
         self.nodos = set()
         self.aristas = []
+        self._heuristica = None
     
     def agregar_arista(self, u, v, peso):
         #Agrega una arista bidireccional al grafo
+        self._heuristica = None
         self.grafo[u].append((v, peso))
         self.grafo[v].append((u, peso))
         self.nodos.add(u)
@@ -18,6 +28,94 @@ class GrafoAutobuses:
     def obtener_nodos(self):
         return list(self.nodos)
 
+    def congelar(self):
+        #Convierte el grafo a la representacion CSR (solo lectura)
+        return GrafoCSR.desde_conexiones((u, v, peso) for peso, u, v in self.aristas)
+
+
+class InternadorNodos:
+    #Asigna un id entero consecutivo a cada nombre de nodo
+    def __init__(self):
+        self.ids = {}
+        self.nombres = []
+
+    def id(self, nombre):
+        i = self.ids.get(nombre)
+        if i is None:
+            i = self.ids[nombre] = len(self.nombres)
+            self.nombres.append(nombre)
+        return i
+
+    def __len__(self):
+        return len(self.nombres)
+
+
+class GrafoCSR:
+    #Grafo no dirigido congelado en formato CSR: los vecinos del nodo i son
+    #indices[indptr[i]:indptr[i+1]] con pesos[indptr[i]:indptr[i+1]].
+    #Cada arista se guarda en ambos sentidos; los nodos son enteros 0..n-1 y
+    #nombres[i] da el nombre original. coordenadas (n x 2, lat/lon) es opcional.
+    def __init__(self, indptr, indices, pesos, nombres=None, coordenadas=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.pesos = pesos
+        self.n = len(indptr) - 1
+        self.nombres = nombres if nombres is not None else list(range(self.n))
+        self.coordenadas = coordenadas
+        self._ids = None
+        self._heuristica = None
+
+    @classmethod
+    def desde_aristas(cls, u, v, pesos, n_nodos=None, nombres=None, coordenadas=None):
+        #Construye el CSR a partir de arreglos de ids (u[k], v[k], pesos[k])
+        u = np.asarray(u, dtype=np.int32)
+        v = np.asarray(v, dtype=np.int32)
+        pesos = np.asarray(pesos, dtype=np.float64)
+        if n_nodos is None:
+            n_nodos = len(nombres) if nombres is not None else (int(max(u.max(), v.max())) + 1 if len(u) else 0)
+
+        origen = np.concatenate([u, v])
+        destino = np.concatenate([v, u])
+        orden = np.argsort(origen, kind="stable")
+        indptr = np.zeros(n_nodos + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origen, minlength=n_nodos), out=indptr[1:])
+        return cls(indptr, destino[orden], np.concatenate([pesos, pesos])[orden], nombres, coordenadas)
+
+    @classmethod
+    def desde_conexiones(cls, conexiones):
+        #Construye el CSR a partir de tuplas (zona1, zona2, peso) con nombres
+        internador = InternadorNodos()
+        u, v, pesos = [], [], []
+        for zona1, zona2, peso in conexiones:
+            u.append(internador.id(zona1))
+            v.append(internador.id(zona2))
+            pesos.append(peso)
+        return cls.desde_aristas(u, v, pesos, len(internador), internador.nombres)
+
+    def id_de(self, nombre):
+        if self._ids is None:
+            self._ids = {nombre: i for i, nombre in enumerate(self.nombres)}
+        return self._ids[nombre]
+
+    def vecinos(self, i):
+        inicio, fin = self.indptr[i], self.indptr[i + 1]
+        return self.indices[inicio:fin], self.pesos[inicio:fin]
+
+    def aristas(self):
+        #Cada arista una sola vez (u < v) como arreglos (u, v, peso)
+        filas = np.repeat(np.arange(self.n, dtype=np.int32), np.diff(self.indptr))
+        mascara = filas < self.indices
+        return filas[mascara], self.indices[mascara], self.pesos[mascara]
+
+    def obtener_nodos(self):
+        return list(self.nombres)
+
+    def num_aristas(self):
+        return len(self.indices) // 2
+
+    def memoria_bytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.pesos.nbytes
+
 
 class UnionFind: 
     def __init__(self, nodos):
@@ -47,7 +145,45 @@ class UnionFind:
         return True
 
 
+def prim_csr(csr, inicio=0):
+    #Prim sobre ids enteros; regresa arreglos (u, v, peso) del MST
+    if csr.n == 0:
+        return np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0)
+    visitados = bytearray(csr.n)
+    visitados[inicio] = 1
+    n_visitados = 1
+    mst_u, mst_v, mst_peso = [], [], []
+    indptr, indices, pesos = csr.indptr, csr.indices, csr.pesos
+
+    heap = [(peso, inicio, vecino) for vecino, peso in
+            zip(indices[indptr[inicio]:indptr[inicio + 1]].tolist(), pesos[indptr[inicio]:indptr[inicio + 1]].tolist())]
+    heapq.heapify(heap)
+    while heap and n_visitados < csr.n:
+        peso, u, v = heapq.heappop(heap)
+        if visitados[v]:
+            continue
+        visitados[v] = 1
+        n_visitados += 1
+        mst_u.append(u)
+        mst_v.append(v)
+        mst_peso.append(peso)
+        inicio_v, fin_v = indptr[v], indptr[v + 1]
+        for vecino, peso_arista in zip(indices[inicio_v:fin_v].tolist(), pesos[inicio_v:fin_v].tolist()):
+            if not visitados[vecino]:
+                heapq.heappush(heap, (peso_arista, v, vecino))
+
+    return np.array(mst_u, np.int32), np.array(mst_v, np.int32), np.array(mst_peso)
+
+
+def _mst_con_nombres(csr, mst_u, mst_v, mst_peso):
+    nombres = csr.nombres
+    mst = [(nombres[u], nombres[v], peso) for u, v, peso in zip(mst_u.tolist(), mst_v.tolist(), mst_peso.tolist())]
+    return mst, sum(peso for _, _, peso in mst)
+
+
 def algoritmo_prim(grafo):
+    if isinstance(grafo, GrafoCSR):
+        return _mst_con_nombres(grafo, *prim_csr(grafo))
     nodos = grafo.obtener_nodos()
     if not nodos:
         return [], 0
@@ -81,7 +217,42 @@ def algoritmo_prim(grafo):
     return mst, peso_total
 
 
+def kruskal_csr(csr):
+    #Kruskal sobre ids enteros: aristas ordenadas con numpy y union-find en listas
+    u, v, pesos = csr.aristas()
+    orden = np.argsort(pesos, kind="stable")
+    padre = list(range(csr.n))
+    rango = bytearray(csr.n)
+
+    def encontrar(x):
+        raiz = x
+        while padre[raiz] != raiz:
+            raiz = padre[raiz]
+        while padre[x] != raiz:  #compresion de camino
+            padre[x], x = raiz, padre[x]
+        return raiz
+
+    elegidas = []
+    for k, a, b in zip(orden.tolist(), u[orden].tolist(), v[orden].tolist()):
+        raiz_a, raiz_b = encontrar(a), encontrar(b)
+        if raiz_a == raiz_b:
+            continue
+        if rango[raiz_a] < rango[raiz_b]:
+            raiz_a, raiz_b = raiz_b, raiz_a
+        padre[raiz_b] = raiz_a
+        if rango[raiz_a] == rango[raiz_b]:
+            rango[raiz_a] += 1
+        elegidas.append(k)
+        if len(elegidas) == csr.n - 1:
+            break
+
+    elegidas = np.array(elegidas, dtype=np.int64)
+    return u[elegidas], v[elegidas], pesos[elegidas]
+
+
 def algoritmo_kruskal(grafo):
+    if isinstance(grafo, GrafoCSR):
+        return _mst_con_nombres(grafo, *kruskal_csr(grafo))
     nodos = grafo.obtener_nodos()
     aristas = sorted(grafo.aristas)  #ordenar por peso
     
@@ -100,7 +271,38 @@ def algoritmo_kruskal(grafo):
     return mst, peso_total
 
 
+def dijkstra_csr(csr, origen):
+    #Dijkstra sobre ids enteros; regresa arreglos de distancias y predecesores (-1 = ninguno)
+    indptr, indices, pesos = csr.indptr, csr.indices, csr.pesos
+    distancias = [float('inf')] * csr.n
+    predecesores = [-1] * csr.n
+    visitados = bytearray(csr.n)
+    distancias[origen] = 0
+
+    heap = [(0, origen)]
+    while heap:
+        dist_actual, nodo_actual = heapq.heappop(heap)
+        if visitados[nodo_actual]:
+            continue
+        visitados[nodo_actual] = 1
+
+        inicio, fin = indptr[nodo_actual], indptr[nodo_actual + 1]
+        for vecino, peso in zip(indices[inicio:fin].tolist(), pesos[inicio:fin].tolist()):
+            distancia = dist_actual + peso
+            if distancia < distancias[vecino]:
+                distancias[vecino] = distancia
+                predecesores[vecino] = nodo_actual
+                heapq.heappush(heap, (distancia, vecino))
+
+    return np.array(distancias), np.array(predecesores, dtype=np.int32)
+
+
 def algoritmo_dijkstra(grafo, origen):
+    if isinstance(grafo, GrafoCSR):
+        distancias, predecesores = dijkstra_csr(grafo, grafo.id_de(origen))
+        nombres = grafo.nombres
+        return ({nombres[i]: d for i, d in enumerate(distancias.tolist())},
+                {nombres[i]: (nombres[p] if p >= 0 else None) for i, p in enumerate(predecesores.tolist())})
     distancias = {nodo: float('inf') for nodo in grafo.obtener_nodos()}
     distancias[origen] = 0
     predecesores = {nodo: None for nodo in grafo.obtener_nodos()}
@@ -150,26 +352,439 @@ def crear_red_guadalajara():
     return grafo
 
 
-def imprimir_resultados():
+# --- carga de redes reales (CSV de aristas o GTFS) con cache binaria ---
+
+RADIO_TIERRA_KM = 6371.0088
+
+def distancia_haversine(lat1, lon1, lat2, lon2):
+    #Distancia en km sobre la esfera; acepta escalares o arreglos
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(a))
+
+
+def _columna(encabezado, nombre, por_defecto):
+    return encabezado.index(nombre) if nombre in encabezado else por_defecto
+
+
+def cargar_csv_aristas(ruta, col_origen="origen", col_destino="destino", col_peso="peso"):
+    #Lee un CSV (origen, destino, peso) fila por fila; si el encabezado no trae esos
+    #nombres se usan las tres primeras columnas. Los ids se guardan en array (4 bytes
+    #por id) y no en tuplas, asi millones de filas caben en memoria.
+    internador = InternadorNodos()
+    u, v, pesos = array("i"), array("i"), array("d")
+    with open(ruta, "r", encoding="utf-8-sig", newline="") as f:
+        lector = csv.reader(f)
+        encabezado = [c.strip() for c in next(lector, [])]
+        i_o = _columna(encabezado, col_origen, 0)
+        i_d = _columna(encabezado, col_destino, 1)
+        i_p = _columna(encabezado, col_peso, 2)
+        if col_origen not in encabezado:
+            try:  #sin encabezado: la primera fila tambien es una arista
+                float(encabezado[i_p])
+                f.seek(0)
+                lector = csv.reader(f)
+            except (ValueError, IndexError):
+                pass
+        for fila in lector:
+            if len(fila) <= max(i_o, i_d, i_p):
+                continue
+            u.append(internador.id(fila[i_o]))
+            v.append(internador.id(fila[i_d]))
+            pesos.append(float(fila[i_p]))
+    return GrafoCSR.desde_aristas(np.frombuffer(u, np.int32), np.frombuffer(v, np.int32),
+                                  np.frombuffer(pesos, np.float64), len(internador), internador.nombres)
+
+
+def cargar_gtfs(carpeta):
+    #Construye la red a partir de stops.txt y stop_times.txt: cada par de paradas
+    #consecutivas de un viaje es una arista con peso = distancia haversine en km.
+    #stop_times.txt se lee en streaming y se asume agrupado por trip_id (como lo
+    #exportan las agencias); dentro de cada viaje se ordena por stop_sequence.
+    internador = InternadorNodos()
+    latitudes, longitudes = array("d"), array("d")
+    with open(os.path.join(carpeta, "stops.txt"), "r", encoding="utf-8-sig", newline="") as f:
+        lector = csv.reader(f)
+        encabezado = [c.strip() for c in next(lector)]
+        i_id, i_lat, i_lon = encabezado.index("stop_id"), encabezado.index("stop_lat"), encabezado.index("stop_lon")
+        for fila in lector:
+            internador.id(fila[i_id])
+            latitudes.append(float(fila[i_lat] or "nan"))
+            longitudes.append(float(fila[i_lon] or "nan"))
+
+    u, v = array("i"), array("i")
+    with open(os.path.join(carpeta, "stop_times.txt"), "r", encoding="utf-8-sig", newline="") as f:
+        lector = csv.reader(f)
+        encabezado = [c.strip() for c in next(lector)]
+        i_viaje, i_parada, i_seq = (encabezado.index("trip_id"), encabezado.index("stop_id"),
+                                    encabezado.index("stop_sequence"))
+        ids = internador.ids
+        viaje_actual, paradas = None, []
+
+        def cerrar_viaje():
+            paradas.sort()
+            for (_, a), (_, b) in zip(paradas, paradas[1:]):
+                if a != b:
+                    u.append(a)
+                    v.append(b)
+            paradas.clear()
+
+        for fila in lector:
+            if fila[i_viaje] != viaje_actual:
+                cerrar_viaje()
+                viaje_actual = fila[i_viaje]
+            parada = ids.get(fila[i_parada])
+            if parada is not None:
+                paradas.append((int(fila[i_seq]), parada))
+        cerrar_viaje()
+
+    #muchas rutas repiten el mismo tramo: se deja una sola arista por par de paradas
+    u, v = np.frombuffer(u, np.int32), np.frombuffer(v, np.int32)
+    pares = np.unique(np.minimum(u, v).astype(np.int64) << 32 | np.maximum(u, v))
+    u, v = (pares >> 32).astype(np.int32), (pares & 0xFFFFFFFF).astype(np.int32)
+    coordenadas = np.column_stack([np.frombuffer(latitudes, np.float64), np.frombuffer(longitudes, np.float64)])
+    pesos = distancia_haversine(coordenadas[u, 0], coordenadas[u, 1], coordenadas[v, 0], coordenadas[v, 1])
+    pesos = np.round(pesos, 3)
+    return GrafoCSR.desde_aristas(u, v, pesos, len(internador), internador.nombres, coordenadas)
+
+
+def guardar_cache(csr, ruta_cache):
+    #npz sin comprimir: cargarlo es copiar los arreglos, sin volver a parsear texto
+    extra = {"coordenadas": csr.coordenadas} if csr.coordenadas is not None else {}
+    np.savez(ruta_cache, indptr=csr.indptr, indices=csr.indices, pesos=csr.pesos,
+             nombres=np.array([str(n) for n in csr.nombres]), **extra)
+
+
+def cargar_cache(ruta_cache):
+    with np.load(ruta_cache) as datos:
+        coordenadas = datos["coordenadas"] if "coordenadas" in datos.files else None
+        return GrafoCSR(datos["indptr"], datos["indices"], datos["pesos"], datos["nombres"].tolist(), coordenadas)
+
+
+def cargar_red(ruta, ruta_cache=None):
+    #ruta puede ser una carpeta GTFS o un CSV de aristas. La cache (.npz junto a la
+    #fuente por defecto) se reutiliza mientras sea mas nueva que los archivos de origen.
+    if os.path.isdir(ruta):
+        fuentes = [os.path.join(ruta, "stops.txt"), os.path.join(ruta, "stop_times.txt")]
+        ruta_cache = ruta_cache or os.path.join(ruta, "red_cache.npz")
+    else:
+        fuentes = [ruta]
+        ruta_cache = ruta_cache or os.path.splitext(ruta)[0] + "_cache.npz"
+
+    if os.path.exists(ruta_cache) and os.path.getmtime(ruta_cache) >= max(os.path.getmtime(f) for f in fuentes):
+        return cargar_cache(ruta_cache)
+
+    csr = cargar_gtfs(ruta) if os.path.isdir(ruta) else cargar_csv_aristas(ruta)
+    try:
+        guardar_cache(csr, ruta_cache)
+    except OSError as e:
+        print(f"No se pudo guardar la cache {ruta_cache}: {e}")
+    return csr
+
+
+# --- consultas punto a punto ---
+
+def _funcion_vecinos(grafo):
+    if isinstance(grafo, GrafoCSR):
+        indptr, indices, pesos = grafo.indptr, grafo.indices, grafo.pesos
+        def vecinos(i):
+            inicio, fin = indptr[i], indptr[i + 1]
+            return zip(indices[inicio:fin].tolist(), pesos[inicio:fin].tolist())
+        return vecinos
+    return lambda nodo: grafo.grafo.get(nodo, ())
+
+
+def _coordenadas_alineadas(grafo, coordenadas):
+    #Coordenadas como arreglo n x 2 en el orden de los nodos del grafo (ids de un
+    #GrafoCSR o list(grafo.nodos)); los nodos sin coordenadas quedan en nan
+    if isinstance(grafo, GrafoCSR):
+        claves = grafo.nombres
+        if not isinstance(coordenadas, dict):
+            coordenadas = np.asarray(coordenadas, dtype=np.float64)
+            if coordenadas.shape != (grafo.n, 2):
+                raise ValueError(f"Se esperaban coordenadas de forma ({grafo.n}, 2), no {coordenadas.shape}")
+            return claves, coordenadas
+    elif isinstance(coordenadas, dict):
+        claves = list(grafo.nodos)
+    else:
+        raise ValueError("Para GrafoAutobuses las coordenadas deben ser un dict nombre -> (lat, lon)")
+    return claves, np.array([coordenadas.get(n, (np.nan, np.nan)) for n in claves], dtype=np.float64).reshape(-1, 2)
+
+
+def _preparar_heuristica(grafo, coordenadas):
+    #Lo que no depende del destino: el factor c (el mayor, como mucho 1, tal que
+    #c * haversine(arista) <= peso en todas las aristas) y lat/lon en radianes.
+    #Es O(V + E), asi que se guarda en el grafo y solo se rehace si cambia el
+    #objeto de coordenadas o se agregan aristas. Regresa None si falta alguna
+    #coordenada: sin cota para sus aristas la busqueda usa h = 0 (Dijkstra).
+    if grafo._heuristica is not None and grafo._heuristica[0] is coordenadas:
+        return grafo._heuristica[1]
+
+    claves, coords = _coordenadas_alineadas(grafo, coordenadas)
+    if isinstance(grafo, GrafoCSR):
+        ids = None
+        u, v, pesos = grafo.aristas()
+    else:
+        ids = {nombre: i for i, nombre in enumerate(claves)}
+        u = np.array([ids[a] for _, a, _ in grafo.aristas], dtype=np.int64)
+        v = np.array([ids[b] for _, _, b in grafo.aristas], dtype=np.int64)
+        pesos = np.array([peso for peso, _, _ in grafo.aristas], dtype=np.float64)
+
+    preparada = None
+    if not np.isnan(coords).any():
+        rectas = distancia_haversine(coords[u, 0], coords[u, 1], coords[v, 0], coords[v, 1])
+        validas = rectas > 0
+        escala = min(1.0, float((pesos[validas] / rectas[validas]).min())) if validas.any() else 1.0
+        radianes = np.radians(coords)
+        preparada = (escala, ids, radianes[:, 0].tolist(), radianes[:, 1].tolist())
+    grafo._heuristica = (coordenadas, preparada)
+    return preparada
+
+
+def _heuristica_geografica(grafo, destino, coordenadas):
+    #h(v) = c * distancia en linea recta de v al destino. Por la desigualdad del
+    #triangulo cualquier camino mide al menos c * haversine de sus extremos, asi h
+    #es admisible y consistente aunque los pesos esten redondeados o en otra
+    #unidad, sin importar cuantos tramos tenga la ruta. h se evalua solo en los
+    #nodos que la busqueda toca.
+    preparada = _preparar_heuristica(grafo, coordenadas)
+    if preparada is None:
+        return lambda nodo: 0.0
+    escala, ids, lat, lon = preparada
+    t = destino if ids is None else ids[destino]
+    lat_t, lon_t, cos_t = lat[t], lon[t], math.cos(lat[t])
+    factor = 2 * RADIO_TIERRA_KM * escala
+
+    def h(nodo):
+        i = nodo if ids is None else ids[nodo]
+        a = math.sin((lat[i] - lat_t) / 2) ** 2 + math.cos(lat[i]) * cos_t * math.sin((lon[i] - lon_t) / 2) ** 2
+        return factor * math.asin(math.sqrt(a))
+    return h
+
+
+def _camino(predecesores, nodo):
+    camino = []
+    while nodo is not None:
+        camino.append(nodo)
+        nodo = predecesores[nodo]
+    camino.reverse()
+    return camino
+
+
+def _a_estrella(vecinos, origen, destino, h):
+    #Con h = 0 es Dijkstra con salida temprana. Un nodo puede re-expandirse si
+    #mejora su distancia, asi basta con que h sea admisible.
+    distancias = {origen: 0}
+    predecesores = {origen: None}
+    heap = [(h(origen), 0, origen)]
+    expandidos = set()
+
+    while heap:
+        _, dist_actual, nodo_actual = heapq.heappop(heap)
+        if dist_actual > distancias[nodo_actual]:
+            continue
+        if nodo_actual == destino:
+            return dist_actual, _camino(predecesores, destino), len(expandidos) + 1
+        expandidos.add(nodo_actual)
+
+        for vecino, peso in vecinos(nodo_actual):
+            distancia = dist_actual + peso
+            if distancia < distancias.get(vecino, float('inf')):
+                distancias[vecino] = distancia
+                predecesores[vecino] = nodo_actual
+                heapq.heappush(heap, (distancia + h(vecino), distancia, vecino))
+
+    return float('inf'), [], len(expandidos)
+
+
+def _dijkstra_bidireccional(vecinos, origen, destino):
+    #Una busqueda desde cada extremo (el grafo es no dirigido); se avanza siempre
+    #el lado con menor distancia tentativa y se para cuando la suma de ambos
+    #frentes ya no puede mejorar la mejor ruta encontrada
+    if origen == destino:
+        return 0, [origen], 1
+    distancias = ({origen: 0}, {destino: 0})
+    predecesores = ({origen: None}, {destino: None})
+    heaps = ([(0, origen)], [(0, destino)])
+    cerrados = (set(), set())
+    mejor, encuentro = float('inf'), None
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= mejor:
+            break
+        lado = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        otro = 1 - lado
+        dist_actual, nodo_actual = heapq.heappop(heaps[lado])
+        if nodo_actual in cerrados[lado]:
+            continue
+        cerrados[lado].add(nodo_actual)
+
+        for vecino, peso in vecinos(nodo_actual):
+            distancia = dist_actual + peso
+            if distancia < distancias[lado].get(vecino, float('inf')):
+                distancias[lado][vecino] = distancia
+                predecesores[lado][vecino] = nodo_actual
+                heapq.heappush(heaps[lado], (distancia, vecino))
+            if vecino in distancias[otro]:
+                total = distancias[lado][vecino] + distancias[otro][vecino]
+                if total < mejor:
+                    mejor, encuentro = total, vecino
+
+    visitados = len(cerrados[0]) + len(cerrados[1])
+    if encuentro is None:
+        return float('inf'), [], visitados
+    ida = _camino(predecesores[0], encuentro)
+    vuelta = _camino(predecesores[1], encuentro)
+    return mejor, ida + vuelta[::-1][1:], visitados
+
+
+def ruta_minima(grafo, origen, destino, metodo=None, coordenadas=None):
+    #Ruta mas corta entre dos zonas sin recorrer toda la red.
+    #metodo: "bidireccional", "astar" o "dijkstra" (unidireccional con salida
+    #temprana). Por defecto A* si hay coordenadas (lat, lon) y si no bidireccional.
+    #coordenadas: dict nombre -> (lat, lon), o para un GrafoCSR tambien un arreglo
+    #n x 2; un GrafoCSR sin este argumento usa las suyas.
+    #Regresa (distancia, ruta, nodos_visitados).
+    es_csr = isinstance(grafo, GrafoCSR)
+    if coordenadas is None and es_csr:
+        coordenadas = grafo.coordenadas
+    if metodo is None:
+        metodo = "astar" if coordenadas is not None else "bidireccional"
+
+    vecinos = _funcion_vecinos(grafo)
+    s, t = (grafo.id_de(origen), grafo.id_de(destino)) if es_csr else (origen, destino)
+    if metodo == "bidireccional":
+        distancia, ruta, visitados = _dijkstra_bidireccional(vecinos, s, t)
+    elif metodo == "astar":
+        if coordenadas is None:
+            raise ValueError("A* necesita coordenadas (lat, lon) de las paradas")
+        distancia, ruta, visitados = _a_estrella(vecinos, s, t, _heuristica_geografica(grafo, t, coordenadas))
+    elif metodo == "dijkstra":
+        distancia, ruta, visitados = _a_estrella(vecinos, s, t, lambda nodo: 0)
+    else:
+        raise ValueError(f"Metodo desconocido: {metodo}")
+
+    if es_csr:
+        ruta = [grafo.nombres[i] for i in ruta]
+    return distancia, ruta, visitados
+
+
+# --- matriz de distancias todos contra todos ---
+
+DENSIDAD_FLOYD = 0.02  #desde esta densidad Floyd-Warshall vectorizado gana a n Dijkstras
+MAX_NODOS_FLOYD = 3000  #Floyd-Warshall es O(n^3) y trabaja con la matriz completa en RAM
+FILAS_POR_TAREA = 64
+
+_grafo_trabajador = None
+_matriz_trabajador = None
+
+
+def densidad(grafo):
+    n = grafo.n
+    return grafo.num_aristas() / (n * (n - 1) / 2) if n > 1 else 1.0
+
+
+def floyd_warshall(csr):
+    #Cada paso k actualiza toda la matriz con un solo np.minimum
+    n = csr.n
+    d = np.full((n, n), np.inf)
+    filas = np.repeat(np.arange(n), np.diff(csr.indptr))
+    np.minimum.at(d, (filas, csr.indices), csr.pesos)
+    np.fill_diagonal(d, 0)
+    for k in range(n):
+        np.minimum(d, d[:, k, None] + d[None, k, :], out=d)
+    return d
+
+
+def _iniciar_trabajador(carpeta, ruta_matriz):
+    #Los procesos abren el grafo y la matriz con mmap: todos comparten las mismas
+    #paginas del archivo en lugar de recibir una copia del grafo cada uno
+    global _grafo_trabajador, _matriz_trabajador
+    arreglos = [np.load(os.path.join(carpeta, nombre + ".npy"), mmap_mode="r").view(np.ndarray)
+                for nombre in ("indptr", "indices", "pesos")]
+    _grafo_trabajador = GrafoCSR(*arreglos)
+    _matriz_trabajador = np.load(ruta_matriz, mmap_mode="r+")
+
+
+def _filas_dijkstra(inicio, fin):
+    #cada tarea escribe filas distintas de la matriz, no hace falta sincronizar
+    for origen in range(inicio, fin):
+        _matriz_trabajador[origen] = dijkstra_csr(_grafo_trabajador, origen)[0]
+    _matriz_trabajador.flush()
+    return fin - inicio
+
+
+def matriz_distancias(grafo, ruta_salida, metodo=None, workers=None):
+    #Distancias entre todas las zonas en una matriz float32 n x n guardada como .npy
+    #(se abre con np.load(ruta, mmap_mode="r")). metodo: "dijkstra" (uno por origen
+    #en un pool de procesos) o "floyd"; por defecto Floyd-Warshall si el grafo es
+    #pequeño y denso. Regresa (matriz, nombres, metodo); la fila/columna i es nombres[i].
+    csr = grafo.congelar() if isinstance(grafo, GrafoAutobuses) else grafo
+    n = csr.n
+    if metodo is None:
+        metodo = "floyd" if n <= MAX_NODOS_FLOYD and densidad(csr) >= DENSIDAD_FLOYD else "dijkstra"
+
+    matriz = np.lib.format.open_memmap(ruta_salida, mode="w+", dtype=np.float32, shape=(n, n))
+    if metodo == "floyd":
+        matriz[:] = floyd_warshall(csr)
+    elif metodo == "dijkstra":
+        workers = workers or os.cpu_count() or 1
+        tareas = [(i, min(i + FILAS_POR_TAREA, n)) for i in range(0, n, FILAS_POR_TAREA)]
+        if workers == 1 or len(tareas) == 1:
+            for origen in range(n):
+                matriz[origen] = dijkstra_csr(csr, origen)[0]
+        else:
+            matriz.flush()
+            with tempfile.TemporaryDirectory() as carpeta:
+                for nombre in ("indptr", "indices", "pesos"):
+                    np.save(os.path.join(carpeta, nombre + ".npy"), getattr(csr, nombre))
+                with ProcessPoolExecutor(workers, initializer=_iniciar_trabajador,
+                                         initargs=(carpeta, ruta_salida)) as ejecutor:
+                    list(ejecutor.map(_filas_dijkstra, *zip(*tareas)))
+    else:
+        raise ValueError(f"Metodo desconocido: {metodo}")
+    matriz.flush()
+    return matriz, list(csr.nombres), metodo
+
+
+LIMITE_LISTADO = 30  #en redes grandes solo se listan las primeras lineas de cada seccion
+
+
+def _conexiones_ordenadas(grafo, limite):
+    if isinstance(grafo, GrafoCSR):
+        u, v, pesos = grafo.aristas()
+        orden = np.argsort(pesos, kind="stable")[:limite]
+        return [(p, grafo.nombres[a], grafo.nombres[b]) for p, a, b in
+                zip(pesos[orden].tolist(), u[orden].tolist(), v[orden].tolist())]
+    return sorted(grafo.aristas)[:limite]
+
+
+def imprimir_resultados(ruta=None, origen="Centro"):
     print("=" * 70)
     print("SISTEMA DE OPTIMIZACIÓN DE RUTAS DE AUTOBUSES - GUADALAJARA")
     print("="*70)
     print()
     
-    #crear grafo
-    grafo = crear_red_guadalajara()
+    #crear grafo (o cargar una red GTFS/CSV si se indica una ruta)
+    if ruta:
+        grafo = cargar_red(ruta)
+        if origen not in grafo.obtener_nodos():
+            origen = grafo.nombres[0]
+    else:
+        grafo = crear_red_guadalajara()
+    total_conexiones = grafo.num_aristas() if isinstance(grafo, GrafoCSR) else len(grafo.aristas)
     
     print("RED DE TRANSPORTE ACTUAL")
     print("-"*70)
     print("Zonas conectadas:")
     zonas = grafo.obtener_nodos()
-    print(f"  {', '.join(sorted(zonas))}")
+    print(f"  {', '.join(sorted(zonas)[:LIMITE_LISTADO])}")
     print(f"\nTotal de zonas: {len(zonas)}")
-    print(f"Total de conexiones: {len(grafo.aristas)}")
+    print(f"Total de conexiones: {total_conexiones}")
     print()
     
     print("Conexiones existentes:")
-    for peso, u, v in sorted(grafo.aristas):
+    for peso, u, v in _conexiones_ordenadas(grafo, LIMITE_LISTADO):
         print(f"  {u} ↔ {v}: {peso} km")
     print()
     
@@ -179,7 +794,7 @@ def imprimir_resultados():
     print("=" * 70)
     mst_prim, peso_prim = algoritmo_prim(grafo)
     print("Rutas seleccionadas para el MST:")
-    for u, v, peso in mst_prim:
+    for u, v, peso in mst_prim[:LIMITE_LISTADO]:
         print(f"  {u} {v}: {peso} km")
     print(f"\nDistancia total minima: {peso_prim} km")
     print(f"   Rutas en el MST: {len(mst_prim)}")
@@ -191,7 +806,7 @@ def imprimir_resultados():
     print("=" * 70)
     mst_kruskal, peso_kruskal = algoritmo_kruskal(grafo)
     print("Rutas seleccionadas para el MST:")
-    for u, v, peso in mst_kruskal:
+    for u, v, peso in mst_kruskal[:LIMITE_LISTADO]:
         print(f"  {u}  {v}: {peso} km")
     print(f"\nDistancia total minima: {peso_kruskal} km")
     print(f"   Rutas en el MST: {len(mst_kruskal)}")
@@ -205,18 +820,20 @@ def imprimir_resultados():
         print(f"   Peso total del MST: {peso_prim} km")
     else:
         print("Los pesos difieren")
+    csr = grafo if isinstance(grafo, GrafoCSR) else grafo.congelar()
+    _, peso_csr = algoritmo_kruskal(csr)
+    print(f"   Peso con la representacion CSR: {peso_csr} km ({csr.memoria_bytes()} bytes en arreglos)")
     print()
     print("=" * 70)
     print("ALGORITMO DE DIJKSTRA(ruta minima)")
     print("=" * 70)
-    origen = "Centro"
     distancias, predecesores = algoritmo_dijkstra(grafo, origen)
     
     print(f"Distancias mínimas desde '{origen}' a todas las zonas:\n")
     print(f"{'Destino':<15} {'Distancia':<12} {'Ruta'}")
     print("-" * 70)
     
-    for destino in sorted(distancias.keys()):
+    for destino in sorted(distancias.keys())[:LIMITE_LISTADO]:
         if distancias[destino] == float('inf'):
             print(f"{destino:<15} {'No disponible':<12} No alcanzable")
         else:
@@ -229,6 +846,41 @@ def imprimir_resultados():
             
             ruta_str = " ".join(ruta)
             print(f"{destino:<15} {distancias[destino]:<12.1f} {ruta_str}")
-    
+
+    print()
+
+    #consulta punto a punto hacia la zona alcanzable mas lejana
+    alcanzables = {n: d for n, d in distancias.items() if d != float('inf')}
+    destino = max(alcanzables, key=alcanzables.get)
+    print("=" * 70)
+    print(f"RUTA PUNTO A PUNTO: {origen} -> {destino}")
+    print("=" * 70)
+    print(f"{'Metodo':<15} {'Distancia':<12} {'Nodos visitados'}")
+    print("-" * 70)
+    print(f"{'completo':<15} {alcanzables[destino]:<12.1f} {len(alcanzables)}")
+    metodos = ["dijkstra", "bidireccional"]
+    if isinstance(grafo, GrafoCSR) and grafo.coordenadas is not None:
+        metodos.append("astar")
+    for metodo in metodos:
+        distancia, ruta, visitados = ruta_minima(grafo, origen, destino, metodo)
+        print(f"{metodo:<15} {distancia:<12.1f} {visitados}")
+    print(f"\nRuta: {' '.join(ruta)}")
+
+    #matriz completa solo para redes pequeñas; para redes grandes usar matriz_distancias
+    if len(zonas) <= 12:
+        print()
+        print("=" * 70)
+        print("MATRIZ DE DISTANCIAS (todas las zonas)")
+        print("=" * 70)
+        with tempfile.TemporaryDirectory() as carpeta:
+            matriz, nombres, metodo = matriz_distancias(grafo, os.path.join(carpeta, "matriz.npy"))
+            orden = sorted(range(len(nombres)), key=lambda i: nombres[i])
+            print(f"Metodo: {metodo} (densidad {densidad(csr):.2f})\n")
+            print(" " * 12 + "".join(f"{nombres[j][:7]:>8}" for j in orden))
+            for i in orden:
+                print(f"{nombres[i][:11]:<12}" + "".join(f"{matriz[i, j]:>8.1f}" for j in orden))
+            del matriz
+
 if __name__ == "__main__":
-    imprimir_resultados()
\ No newline at end of file
+    #uso: python EquipoSnoopy_PrimKruskal.py [carpeta_gtfs | aristas.csv] [origen]
+    imprimir_resultados(*sys.argv[1:3])
\ No newline at end of file
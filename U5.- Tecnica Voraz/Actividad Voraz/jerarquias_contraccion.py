@@ -0,0 +1,308 @@
+import time
+import heapq
+import random
+import argparse
+import numpy as np
+
+from EquipoSnoopy_PrimKruskal import GrafoAutobuses, GrafoCSR, ruta_minima
+
+# Contraction Hierarchies sobre la red de autobuses. El preprocesamiento contrae
+# los nodos de menos a mas importante (diferencia de aristas) agregando atajos
+# que conservan las distancias; una consulta es un Dijkstra bidireccional que
+# solo sube de rango, asi que explora unos cientos de nodos en vez de la red.
+
+LIMITE_TESTIGOS = 60  #nodos asentados por busqueda de testigos antes de rendirse
+
+
+def _busqueda_testigos(ady, origen, excluido, objetivos, limite_dist, limite_nodos):
+    #Dijkstra local que evita el nodo que se va a contraer; termina al asentar todos
+    #los objetivos. Las distancias tentativas tambien sirven: cada una es la
+    #longitud de un camino real.
+    distancias = {origen: 0}
+    heap = [(0, origen)]
+    asentados = 0
+    pendientes = len(objetivos)
+    while heap:
+        dist_actual, nodo = heapq.heappop(heap)
+        if dist_actual > distancias[nodo]:
+            continue
+        if dist_actual > limite_dist or asentados >= limite_nodos:
+            break
+        asentados += 1
+        if nodo in objetivos:
+            pendientes -= 1
+            if not pendientes:
+                break
+        for vecino, peso in ady[nodo].items():
+            if vecino == excluido:
+                continue
+            distancia = dist_actual + peso
+            if distancia < distancias.get(vecino, float('inf')):
+                distancias[vecino] = distancia
+                heapq.heappush(heap, (distancia, vecino))
+    return distancias
+
+
+def _atajos_necesarios(ady, v, limite_nodos):
+    #Pares (u, w) de vecinos de v cuyo camino u-v-w no tiene testigo mas corto
+    vecinos = list(ady[v].items())
+    atajos = []
+    for i, (u, peso_u) in enumerate(vecinos[:-1]):
+        resto = vecinos[i + 1:]
+        limite = peso_u + max(peso for _, peso in resto)
+        distancias = _busqueda_testigos(ady, u, v, {w for w, _ in resto}, limite, limite_nodos)
+        for w, peso_w in resto:
+            via = peso_u + peso_w
+            if distancias.get(w, float('inf')) > via:
+                atajos.append((u, w, via))
+    return atajos
+
+
+def _prioridad(ady, v, contraidos_vecinos, limite_nodos):
+    #diferencia de aristas (atajos - aristas que se quitan) + vecinos ya contraidos,
+    #este ultimo termino reparte la contraccion de manera uniforme. Regresa tambien
+    #los atajos para no repetir las busquedas si el nodo se contrae enseguida.
+    atajos = _atajos_necesarios(ady, v, limite_nodos)
+    return len(atajos) - len(ady[v]) + contraidos_vecinos[v], atajos
+
+
+class JerarquiaContraccion:
+    #Resultado del preprocesamiento: rango de cada nodo y el grafo "hacia arriba"
+    #en CSR (cada arista va del nodo de menor rango al de mayor rango). medios[k]
+    #es el nodo contraido que reemplaza un atajo, o -1 si la arista es original.
+    def __init__(self, rango, indptr, indices, pesos, medios, nombres):
+        self.rango = rango
+        self.indptr = indptr
+        self.indices = indices
+        self.pesos = pesos
+        self.medios = medios
+        self.nombres = nombres
+        self.n = len(rango)
+        self._arriba = None
+        self._atajos = None
+        self._ids = None
+
+    @classmethod
+    def construir(cls, grafo, limite_testigos=LIMITE_TESTIGOS):
+        csr = grafo.congelar() if isinstance(grafo, GrafoAutobuses) else grafo
+        n = csr.n
+        #adyacencia mutable; las aristas paralelas se quedan con el menor peso
+        ady = [dict() for _ in range(n)]
+        for u in range(n):
+            inicio, fin = csr.indptr[u], csr.indptr[u + 1]
+            for v, peso in zip(csr.indices[inicio:fin].tolist(), csr.pesos[inicio:fin].tolist()):
+                if v != u and peso < ady[u].get(v, float('inf')):
+                    ady[u][v] = peso
+        medio = {}
+        contraidos_vecinos = [0] * n
+        heap = [(_prioridad(ady, v, contraidos_vecinos, limite_testigos)[0], v) for v in range(n)]
+        heapq.heapify(heap)
+
+        rango = np.zeros(n, dtype=np.int32)
+        arriba = [None] * n
+        siguiente = 0
+        while heap:
+            _, v = heapq.heappop(heap)
+            #actualizacion perezosa: si la prioridad empeoro se reencola
+            prioridad, atajos = _prioridad(ady, v, contraidos_vecinos, limite_testigos)
+            if heap and prioridad > heap[0][0]:
+                heapq.heappush(heap, (prioridad, v))
+                continue
+
+            for u, w, via in atajos:
+                if via < ady[u].get(w, float('inf')):
+                    ady[u][w] = ady[w][u] = via
+                    medio[(u, w) if u < w else (w, u)] = v
+
+            arriba[v] = [(u, peso, medio.get((u, v) if u < v else (v, u), -1)) for u, peso in ady[v].items()]
+            for u in ady[v]:
+                del ady[u][v]
+                contraidos_vecinos[u] += 1
+            ady[v] = {}
+            rango[v] = siguiente
+            siguiente += 1
+
+        grados = np.fromiter((len(a) for a in arriba), dtype=np.int64, count=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(grados, out=indptr[1:])
+        planas = [arista for a in arriba for arista in a]
+        indices = np.array([a[0] for a in planas], dtype=np.int32)
+        pesos = np.array([a[1] for a in planas], dtype=np.float64)
+        medios = np.array([a[2] for a in planas], dtype=np.int32)
+        return cls(rango, indptr, indices, pesos, medios, list(csr.nombres))
+
+    def num_atajos(self):
+        return int((self.medios >= 0).sum())
+
+    # --- serializacion ---
+
+    def guardar(self, ruta):
+        np.savez(ruta, rango=self.rango, indptr=self.indptr, indices=self.indices, pesos=self.pesos,
+                 medios=self.medios, nombres=np.array([str(n) for n in self.nombres]))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta) as datos:
+            return cls(datos["rango"], datos["indptr"], datos["indices"], datos["pesos"],
+                       datos["medios"], datos["nombres"].tolist())
+
+    # --- consultas ---
+
+    def _listas_arriba(self):
+        #listas de Python por nodo: en el ciclo de la consulta son mas rapidas que
+        #rebanar arreglos de numpy
+        if self._arriba is None:
+            indices, pesos = self.indices.tolist(), self.pesos.tolist()
+            indptr = self.indptr.tolist()
+            self._arriba = [list(zip(indices[indptr[v]:indptr[v + 1]], pesos[indptr[v]:indptr[v + 1]]))
+                            for v in range(self.n)]
+        return self._arriba
+
+    def id_de(self, nombre):
+        if self._ids is None:
+            self._ids = {nombre: i for i, nombre in enumerate(self.nombres)}
+        return self._ids[nombre]
+
+    def consulta_ids(self, origen, destino):
+        #Dijkstra bidireccional que solo relaja aristas hacia nodos de mayor rango.
+        #Cada lado se detiene cuando su minimo ya no puede mejorar la mejor ruta.
+        #Regresa (distancia, nodo_cumbre, predecesores, visitados).
+        arriba = self._listas_arriba()
+        distancias = ({origen: 0}, {destino: 0})
+        predecesores = ({origen: None}, {destino: None})
+        heaps = ([(0, origen)], [(0, destino)])
+        inf = float('inf')
+        mejor, cumbre = inf, None
+        visitados = 0
+
+        while heaps[0] or heaps[1]:
+            for lado in (0, 1):
+                heap = heaps[lado]
+                if not heap:
+                    continue
+                dist_actual, nodo = heapq.heappop(heap)
+                if dist_actual > distancias[lado][nodo]:
+                    continue
+                if dist_actual >= mejor:
+                    heap.clear()
+                    continue
+                visitados += 1
+                otra = distancias[1 - lado].get(nodo)
+                if otra is not None and dist_actual + otra < mejor:
+                    mejor, cumbre = dist_actual + otra, nodo
+                propias, preds = distancias[lado], predecesores[lado]
+                #stall-on-demand: si un vecino de mayor rango ya llega mas barato,
+                #esta distancia no es la minima y no vale la pena expandir
+                aristas = arriba[nodo]
+                if any(propias.get(vecino, inf) + peso < dist_actual for vecino, peso in aristas):
+                    continue
+                for vecino, peso in aristas:
+                    distancia = dist_actual + peso
+                    if distancia < propias.get(vecino, inf):
+                        propias[vecino] = distancia
+                        preds[vecino] = nodo
+                        heapq.heappush(heap, (distancia, vecino))
+
+        return mejor, cumbre, predecesores, visitados
+
+    def _atajos_por_par(self):
+        #(a, b) con a < b -> nodo medio, solo para los atajos; se arma en la primera
+        #consulta que necesita desempacar una ruta
+        if self._atajos is None:
+            filas = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.indptr))
+            k = np.flatnonzero(self.medios >= 0)
+            a, b = filas[k], self.indices[k].astype(np.int64)
+            self._atajos = dict(zip(zip(np.minimum(a, b).tolist(), np.maximum(a, b).tolist()),
+                                    self.medios[k].tolist()))
+        return self._atajos
+
+    def _desempacar(self, camino):
+        #reemplaza cada atajo por sus dos aristas hasta llegar a aristas originales
+        atajos = self._atajos_por_par()
+        resultado = [camino[0]]
+        pila = [(camino[i], camino[i + 1]) for i in range(len(camino) - 1)][::-1]
+        while pila:
+            a, b = pila.pop()
+            m = atajos.get((a, b) if a < b else (b, a), -1)
+            if m < 0:
+                resultado.append(b)
+            else:
+                pila.append((m, b))
+                pila.append((a, m))
+        return resultado
+
+    def consulta(self, origen, destino):
+        #Misma interfaz que ruta_minima: (distancia, ruta, nodos_visitados)
+        s, t = self.id_de(origen), self.id_de(destino)
+        distancia, cumbre, predecesores, visitados = self.consulta_ids(s, t)
+        if cumbre is None:
+            return float('inf'), [], visitados
+        ida, nodo = [], cumbre
+        while nodo is not None:
+            ida.append(nodo)
+            nodo = predecesores[0][nodo]
+        vuelta, nodo = [], predecesores[1][cumbre]
+        while nodo is not None:
+            vuelta.append(nodo)
+            nodo = predecesores[1][nodo]
+        ruta = self._desempacar(ida[::-1] + vuelta)
+        return distancia, [self.nombres[i] for i in ruta], visitados
+
+
+# --- benchmark ---
+
+def crear_cuadricula(lado, semilla=0):
+    #Cuadricula lado x lado con pesos aleatorios de 1 a 10, como una red urbana
+    rnd = np.random.default_rng(semilla)
+    ids = np.arange(lado * lado, dtype=np.int32).reshape(lado, lado)
+    u = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    v = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    pesos = rnd.integers(1, 11, len(u)).astype(np.float64)
+    return GrafoCSR.desde_aristas(u, v, pesos, lado * lado, [f"n{i}" for i in range(lado * lado)])
+
+
+def benchmark(lado=316, consultas=1000, consultas_dijkstra=20, ruta_cache="jerarquia_cuadricula.npz", semilla=0):
+    grafo = crear_cuadricula(lado, semilla)
+    print(f"Cuadricula {lado}x{lado}: {grafo.n} nodos, {grafo.num_aristas()} aristas")
+
+    t0 = time.perf_counter()
+    jerarquia = JerarquiaContraccion.construir(grafo)
+    t1 = time.perf_counter()
+    print(f"Preprocesamiento: {t1 - t0:.1f} s, {jerarquia.num_atajos()} atajos")
+
+    jerarquia.guardar(ruta_cache)
+    t0 = time.perf_counter()
+    jerarquia = JerarquiaContraccion.cargar(ruta_cache)
+    jerarquia._listas_arriba()
+    jerarquia._atajos_por_par()
+    print(f"Carga desde {ruta_cache}: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    rnd = random.Random(semilla)
+    pares = [(f"n{rnd.randrange(grafo.n)}", f"n{rnd.randrange(grafo.n)}") for _ in range(consultas)]
+
+    t0 = time.perf_counter()
+    visitados_ch = sum(jerarquia.consulta(s, t)[2] for s, t in pares)
+    tiempo_ch = (time.perf_counter() - t0) / consultas
+
+    t0 = time.perf_counter()
+    visitados_dij = 0
+    for s, t in pares[:consultas_dijkstra]:
+        distancia, _, visitados = ruta_minima(grafo, s, t, "dijkstra")
+        visitados_dij += visitados
+        if abs(distancia - jerarquia.consulta(s, t)[0]) > 1e-9:
+            print(f"Distancias distintas para {s} -> {t}")
+    tiempo_dij = (time.perf_counter() - t0) / consultas_dijkstra
+
+    print(f"{'Metodo':<12} {'ms/consulta':>12} {'nodos visitados':>16}")
+    print(f"{'CH':<12} {tiempo_ch * 1000:>12.3f} {visitados_ch // consultas:>16}")
+    print(f"{'Dijkstra':<12} {tiempo_dij * 1000:>12.3f} {visitados_dij // consultas_dijkstra:>16}")
+    print(f"Aceleracion: {tiempo_dij / tiempo_ch:.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de Contraction Hierarchies contra Dijkstra")
+    parser.add_argument("--lado", type=int, default=316, help="Lado de la cuadricula (316 ~ 100k nodos)")
+    parser.add_argument("--consultas", type=int, default=1000)
+    parser.add_argument("--cache", default="jerarquia_cuadricula.npz", help="Archivo donde se guarda la jerarquia")
+    args = parser.parse_args()
+    benchmark(args.lado, args.consultas, ruta_cache=args.cache)